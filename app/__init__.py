@@ -2,6 +2,10 @@ from flask import Flask
 from flask_session import Session
 from app.config import Config
 from app.extensions import init_extensions
+from app.json_provider import OrjsonProvider
+from app.compression import init_compression
+from app.uploads import init_uploads
+from app.email_outbox import init_email_outbox
 from app.auth.routes import auth_bp
 from app.ai.routes import ai_bp
 from app.donations.routes import donation_bp
@@ -10,17 +14,24 @@ from app.calendar.routes import event_bp
 from app.health.routes import health_bp
 from app.partners.routes import partners_bp
 from app.analytics.routes import analytics_bp
+from app.analytics.rollups import init_rollups
 from app.rag.routes import health_rag
 from app.files.routes import file_bp
+from app.search.routes import search_bp
 from flask_cors import CORS
 
 def create_app():
     app = Flask(__name__, template_folder='templates')
     app.config.from_object(Config)
+    app.json = OrjsonProvider(app)
     Session(app)
     CORS(app, resources={r"/*": {"origins": "*"}})
     init_extensions(app)
     register_blueprints(app)
+    init_compression(app)
+    init_uploads(app)
+    init_rollups(app)
+    init_email_outbox(app)
     return app
 
 def register_blueprints(app):
@@ -34,6 +45,7 @@ def register_blueprints(app):
     app.register_blueprint(donation_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(event_bp)
+    app.register_blueprint(search_bp)
 
 if __name__ == "__main__":
     app = create_app()
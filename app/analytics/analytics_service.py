@@ -1,8 +1,36 @@
-from flask import jsonify, session, current_app
-from datetime import datetime, timedelta
-from typing import Tuple, Dict, Union, Optional
-from collections import defaultdict
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from functools import partial
+from flask import jsonify, session, current_app, request
+from datetime import datetime, timedelta, timezone
+from typing import Tuple, Dict, List, Union, Optional
 from dataclasses import dataclass
+from postgrest.exceptions import APIError
+from app.config import Config
+from app.models.pagination import select_page
+from app.analytics.rollups import fetch_rollup_counts
+from app.analytics.result_cache import analytics_cache, cache_key, current_generation, store_result, refresh_in_background
+from app.analytics.length_of_stay import GROUP_COLUMNS, fetch_status_aggregates, summarize_aggregates
+from app.analytics.bucketing import Buckets, DEFAULT_INTERVALS, parse_time_zone, as_utc
+
+executor = None
+executor_lock = threading.Lock()
+
+# Queries still running after their request gave up on them; each one holds a pool slot.
+abandoned_queries = set()
+abandoned_lock = threading.Lock()
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            executor = ThreadPoolExecutor(max_workers=Config.ANALYTICS_WORKERS, thread_name_prefix='analytics')
+        return executor
+
+def release_abandoned(future):
+    with abandoned_lock:
+        abandoned_queries.discard(future)
 
 @dataclass
 class TimeRange:
@@ -18,6 +46,13 @@ class AnalyticsService:
         'all': lambda: timedelta(days=36500)
     }
 
+    ID_COLUMNS = {
+        'pets': 'pet_id',
+        'people': 'person_id',
+        'donations': 'donation_id',
+        'partners': 'id'
+    }
+
     @staticmethod
     def get_client_id() -> Tuple[Optional[str], Optional[Dict], Optional[int]]:
         client_id = session.get('user_id')
@@ -66,87 +101,256 @@ class AnalyticsService:
         return str(change_value), change_percentage, change_type
 
     @staticmethod
-    def get_interval_key(time_filter, date):
-        if time_filter == 'day':
-            return date.strftime("%Y-%m-%d")
-        elif time_filter == 'week':
-            return date.strftime("%Y-%W")
-        elif time_filter == 'month':
-            return date.strftime("%Y-%m")
-        elif time_filter == 'year':
-            return date.strftime("%Y")
-        return date.strftime("%Y-%m-%d")
+    def get_bucket_args() -> Tuple[Optional[str], Optional[str]]:
+        return request.args.get('interval') or None, request.args.get('tz') or None
 
     @staticmethod
-    def group_by_time_interval(data, time_filter, time_range) -> Dict:
-        interval_data = defaultdict(int)
-        current_time = time_range.start_time
-        
-        while current_time <= time_range.end_time:
-            date_key = current_time.strftime("%Y-%m-%d")
-            interval_data[date_key] = 0
-            current_time += timedelta(days=1)
-        
-        for record in data:
-            created_at = datetime.fromisoformat(record['created_at']).strftime("%Y-%m-%d")
-            if created_at in interval_data:
-                interval_data[created_at] += 1
-        
-        return [{"date": date, "count": count} for date, count in interval_data.items()]
+    def get_buckets(time_filter: str, time_range: TimeRange, interval: Optional[str] = None, tz_name: Optional[str] = None) -> Union[Buckets, Tuple[Dict, int]]:
+        interval = interval or DEFAULT_INTERVALS[time_filter]
+        try:
+            tz = parse_time_zone(tz_name)
+            return Buckets(time_range.start_time, time_range.end_time, interval, tz, Config.ANALYTICS_MAX_BUCKETS)
+        except ValueError as e:
+            return {"success": False, "error": str(e)}, 400
+
+    @staticmethod
+    def count_rows(table: str, client_id: str, time_range: TimeRange) -> int:
+        response = current_app.supabase.table(table) \
+            .select('created_at', count='exact', head=True) \
+            .eq('client_id', client_id) \
+            .gte('created_at', time_range.start_time.isoformat()) \
+            .lte('created_at', time_range.end_time.isoformat()) \
+            .execute()
+        return response.count or 0
+
+    @classmethod
+    def fetch_bucket_counts(cls, table: str, client_id: str, time_range: TimeRange, buckets: Buckets) -> List[int]:
+        """Count rows per bucket in the database, falling back to paging created_at only."""
+        try:
+            response = current_app.supabase.rpc('analytics_bucket_counts', {
+                'p_table': table,
+                'p_client_id': str(client_id),
+                'p_start': time_range.start_time.isoformat(),
+                'p_end': time_range.end_time.isoformat(),
+                'p_interval': buckets.interval,
+                'p_time_zone': str(buckets.tz)
+            }).execute()
+            return buckets.count_labels({row['bucket']: row['count'] for row in response.data or []})
+        except APIError as e:
+            # PGRST202: the function is not there yet (migrations/002 has not been applied).
+            if e.code != 'PGRST202':
+                raise
+
+        id_column = cls.ID_COLUMNS[table]
+        timestamps = []
+        cursor = None
+        while True:
+            query = current_app.supabase.table(table) \
+                .select(f'{id_column},created_at') \
+                .eq('client_id', client_id) \
+                .gte('created_at', time_range.start_time.isoformat()) \
+                .lte('created_at', time_range.end_time.isoformat())
+            rows, cursor = select_page(query, id_column, Config.EXPORT_PAGE_SIZE, cursor)
+            timestamps.extend(as_utc(datetime.fromisoformat(row['created_at'])).timestamp() for row in rows)
+            if not cursor:
+                timestamps.sort()
+                return buckets.count_sorted(timestamps)
+
+    @staticmethod
+    def fetch_rollup_totals(table: str, client_id: str, current_range: TimeRange, previous_range: TimeRange, buckets: Buckets) -> Tuple[List[int], int]:
+        """Read both ranges from the daily rollups in one pass.
+
+        Rollups hold whole UTC days, so ranges are rounded to days and each day is counted in
+        the bucket containing its UTC midnight.
+        """
+        current_start = current_range.start_time.date().isoformat()
+        day_counts = fetch_rollup_counts(
+            client_id, table,
+            previous_range.start_time.date().isoformat(),
+            current_range.end_time.date().isoformat()
+        )
+        current_days = sorted((day, count) for day, count in day_counts.items() if day >= current_start)
+        timestamps = [datetime.fromisoformat(day).replace(tzinfo=timezone.utc).timestamp() for day, _ in current_days]
+        counts = buckets.count_sorted(timestamps, [count for _, count in current_days])
+        previous_total = sum(count for day, count in day_counts.items() if day < current_start)
+        return counts, previous_total
     
     @classmethod
-    def fetch_data_by_time(cls, table: str, time_filter: str) -> Tuple[Dict, int]:
-        client_id, error_response, status_code = cls.get_client_id()
-        if error_response:
-            return error_response, status_code
+    def table_queries(cls, table: str, client_id: str, current_range: TimeRange, previous_range: TimeRange, buckets: Buckets) -> Dict:
+        # Rollups are daily, so hourly series always come from the source table.
+        if Config.ANALYTICS_USE_ROLLUPS and buckets.interval != 'hour':
+            return {'rollup_totals': partial(cls.fetch_rollup_totals, table, client_id, current_range, previous_range, buckets)}
+        return {
+            'bucket_counts': partial(cls.fetch_bucket_counts, table, client_id, current_range, buckets),
+            'previous_total': partial(cls.count_rows, table, client_id, previous_range)
+        }
+
+    @staticmethod
+    def timed_call(app, query):
+        with app.app_context():
+            started = time.perf_counter()
+            try:
+                result = query()
+            except Exception as e:
+                result = e
+            return result, round((time.perf_counter() - started) * 1000, 2)
+
+    @classmethod
+    def run_queries(cls, queries: Dict) -> Tuple[Dict, Dict]:
+        """Run {key: callable} concurrently on the analytics pool.
+
+        Returns ({key: result or exception}, {key: elapsed_ms}). Workers get their own app
+        context; anything request-scoped (the client id) must already be bound into the callables.
+        """
+        app = current_app._get_current_object()
+        futures = {key: get_executor().submit(cls.timed_call, app, query) for key, query in queries.items()}
+        # One deadline for the whole set, not ANALYTICS_QUERY_TIMEOUT per query in turn.
+        wait(futures.values(), timeout=Config.ANALYTICS_QUERY_TIMEOUT)
+        results, timings = {}, {}
+        for key, future in futures.items():
+            if future.done():
+                results[key], timings[key] = future.result()
+                continue
+            results[key], timings[key] = TimeoutError(f"Query timed out after {Config.ANALYTICS_QUERY_TIMEOUT}s"), None
+            # Queued queries are dropped; running ones cannot be interrupted, so they are
+            # tracked until they finish and free their slot.
+            if not future.cancel():
+                with abandoned_lock:
+                    abandoned_queries.add(future)
+                    abandoned = len(abandoned_queries)
+                future.add_done_callback(release_abandoned)
+                current_app.logger.warning(f"Analytics query {key} timed out; {abandoned} timed-out queries still running")
+        return results, timings
+
+    @classmethod
+    def build_table_data(cls, table: str, time_filter: str, current_range: TimeRange, previous_range: TimeRange, buckets: Buckets, results: Dict, timings: Dict) -> Tuple[Dict, int]:
+        errors = [result for result in results.values() if isinstance(result, Exception)]
+        if errors:
+            return {"success": False, "error": f"An error occurred: {str(errors[0])}"}, 500
+
+        if 'rollup_totals' in results:
+            bucket_counts, previous_total = results['rollup_totals']
+        else:
+            bucket_counts, previous_total = results['bucket_counts'], results['previous_total']
+        current_total = sum(bucket_counts)
+
+        change_value, change_percentage, change_type = cls.calculate_change(current_total, previous_total)
+
+        time_series_data = buckets.series(bucket_counts)
 
+        return {
+            "success": True,
+            "total_count": current_total,
+            "change_value": change_value,
+            "change_percentage": change_percentage,
+            "change_type": change_type,
+            "time_series": time_series_data,
+            "debug_info": {
+                "table": table,
+                "time_filter": time_filter,
+                "interval": buckets.interval,
+                "time_zone": str(buckets.tz),
+                "current_start_time": current_range.start_time.isoformat(),
+                "current_end_time": current_range.end_time.isoformat(),
+                "previous_start_time": previous_range.start_time.isoformat(),
+                "previous_end_time": previous_range.end_time.isoformat(),
+                "query_ms": timings
+            }
+        }, 200
+
+    @classmethod
+    def get_ranges(cls, time_filter: str, interval: Optional[str] = None, tz_name: Optional[str] = None) -> Union[Tuple[TimeRange, TimeRange, Buckets], Tuple[Dict, int]]:
         current_range = cls.get_time_range(time_filter)
         if isinstance(current_range, tuple):
             return current_range
+        buckets = cls.get_buckets(time_filter, current_range, interval, tz_name)
+        if isinstance(buckets, tuple):
+            return buckets
+        return current_range, cls.get_previous_time_range(time_filter), buckets
 
-        previous_range = cls.get_previous_time_range(time_filter)
-        if isinstance(previous_range, tuple):
-            return previous_range
+    @classmethod
+    def compute_tables(cls, tables, client_id: str, time_filter: str, ranges) -> Tuple[Dict, Dict]:
+        current_range, previous_range, buckets = ranges
+        # Every table's queries go to the pool at once, so the response takes about as
+        # long as the slowest query rather than the sum of all of them.
+        queries = {}
+        for table in tables:
+            for name, query in cls.table_queries(table, client_id, current_range, previous_range, buckets).items():
+                queries[(table, name)] = query
+        results, timings = cls.run_queries(queries)
 
-        try:
-            current_query = current_app.supabase.table(table) \
-                .select('*') \
-                .eq('client_id', client_id) \
-                .gte('created_at', current_range.start_time.isoformat()) \
-                .lte('created_at', current_range.end_time.isoformat()) \
-                .execute()
+        payloads = {}
+        for table in tables:
+            table_results = {name: result for (result_table, name), result in results.items() if result_table == table}
+            table_timings = {name: elapsed for (result_table, name), elapsed in timings.items() if result_table == table}
+            payloads[table] = cls.build_table_data(table, time_filter, current_range, previous_range, buckets, table_results, table_timings)
+        return payloads, timings
 
-            current_total = len(current_query.data)
+    @classmethod
+    def refresh_later(cls, key, table: str, client_id: str, time_filter: str, interval: str, tz_name: Optional[str]):
+        app = current_app._get_current_object()
 
-            previous_query = current_app.supabase.table(table) \
-                .select('*') \
-                .eq('client_id', client_id) \
-                .gte('created_at', previous_range.start_time.isoformat()) \
-                .lte('created_at', previous_range.end_time.isoformat()) \
-                .execute()
+        def refresh():
+            with app.app_context():
+                try:
+                    generation = current_generation(client_id, table)
+                    ranges = cls.get_ranges(time_filter, interval, tz_name)
+                    payloads, _ = cls.compute_tables([table], client_id, time_filter, ranges)
+                    payload, status_code = payloads[table]
+                    if status_code == 200:
+                        store_result(key, payload, generation)
+                except Exception as e:
+                    app.logger.error(f"Background analytics refresh for {table} failed: {str(e)}")
 
-            previous_total = len(previous_query.data)
+        refresh_in_background(key, refresh)
 
-            change_value, change_percentage, change_type = cls.calculate_change(current_total, previous_total)
+    @classmethod
+    def cached_tables(cls, tables, client_id: str, time_filter: str, ranges, tz_name: Optional[str]) -> Tuple[Dict, Dict]:
+        """Return ({table: (payload, status)}, timings), computing only tables missing from the cache.
 
-            time_series_data = cls.group_by_time_interval(current_query.data, time_filter, current_range)
+        Stale entries (within ANALYTICS_CACHE_STALE_TTL of expiring) are served as-is while a
+        background refresh replaces them.
+        """
+        buckets = ranges[2]
+        keys = {table: cache_key(client_id, table, time_filter, buckets.interval, buckets.tz) for table in tables}
+        payloads = {}
+        missing = []
+        for table in tables:
+            entry = analytics_cache.get_entry(keys[table])
+            if entry is None:
+                missing.append(table)
+                continue
+            payload, age = entry
+            stale = age > Config.ANALYTICS_CACHE_TTL
+            if stale:
+                cls.refresh_later(keys[table], table, client_id, time_filter, buckets.interval, tz_name)
+            payloads[table] = dict(payload, cache={"hit": True, "stale": stale, "age_seconds": round(age, 1)}), 200
 
-            return {
-                "success": True,
-                "total_count": current_total,
-                "change_value": change_value,
-                "change_percentage": change_percentage,
-                "change_type": change_type,
-                "time_series": time_series_data,
-                "debug_info": {
-                    "table": table,
-                    "time_filter": time_filter,
-                    "current_start_time": current_range.start_time.isoformat(),
-                    "current_end_time": current_range.end_time.isoformat(),
-                    "previous_start_time": previous_range.start_time.isoformat(),
-                    "previous_end_time": previous_range.end_time.isoformat(),
-                }
-            }, 200
+        timings = {}
+        if missing:
+            generations = {table: current_generation(client_id, table) for table in missing}
+            computed, timings = cls.compute_tables(missing, client_id, time_filter, ranges)
+            for table, (payload, status_code) in computed.items():
+                if status_code == 200:
+                    store_result(keys[table], payload, generations[table])
+                    payload = dict(payload, cache={"hit": False, "stale": False, "age_seconds": 0})
+                payloads[table] = payload, status_code
+        return payloads, timings
+
+    @classmethod
+    def fetch_data_by_time(cls, table: str, time_filter: str) -> Tuple[Dict, int]:
+        client_id, error_response, status_code = cls.get_client_id()
+        if error_response:
+            return error_response, status_code
+
+        interval, tz_name = cls.get_bucket_args()
+        ranges = cls.get_ranges(time_filter, interval, tz_name)
+        if isinstance(ranges[0], dict):
+            return ranges
+
+        try:
+            payloads, _ = cls.cached_tables([table], client_id, time_filter, ranges, tz_name)
+            return payloads[table]
         except Exception as e:
             return {"success": False, "error": f"An error occurred: {str(e)}"}, 500
 
@@ -168,18 +372,64 @@ class AnalyticsService:
 
     @classmethod
     def get_all_data(cls, time_filter: str = 'all') -> Tuple[Dict, int]:
+        client_id, error_response, status_code = cls.get_client_id()
+        if error_response:
+            return error_response, status_code
+
+        interval, tz_name = cls.get_bucket_args()
+        ranges = cls.get_ranges(time_filter, interval, tz_name)
+        if isinstance(ranges[0], dict):
+            return ranges
+
         try:
-            pets_data, _ = cls.get_pets_by_time(time_filter)
-            people_data, _ = cls.get_people_by_time(time_filter)
-            donations_data, _ = cls.get_donations_by_time(time_filter)
-            partners_data, _ = cls.get_partners_by_time(time_filter)
+            started = time.perf_counter()
+            payloads, timings = cls.cached_tables(list(cls.ID_COLUMNS), client_id, time_filter, ranges, tz_name)
 
+            response = {"success": True}
+            for table in cls.ID_COLUMNS:
+                response[table], _ = payloads[table]
+            response["timings"] = {
+                "total_ms": round((time.perf_counter() - started) * 1000, 2),
+                "queries_ms": {f"{table}.{name}": elapsed for (table, name), elapsed in timings.items()}
+            }
+            return response, 200
+        except Exception as e:
+            return {"success": False, "error": f"An error occurred: {str(e)}"}, 500
+
+    @classmethod
+    def get_length_of_stay(cls) -> Tuple[Dict, int]:
+        client_id, error_response, status_code = cls.get_client_id()
+        if error_response:
+            return error_response, status_code
+
+        to_status = request.args.get('to', 'Adopted')
+        from_status = request.args.get('from') or None
+        group_by = [name.strip() for name in request.args.get('group_by', 'type').split(',') if name.strip()]
+        unknown = [name for name in group_by if name not in GROUP_COLUMNS]
+        if unknown:
+            return {"success": False, "error": f"group_by must be made of: {', '.join(GROUP_COLUMNS)}"}, 400
+
+        try:
+            rows = fetch_status_aggregates(client_id, from_status, to_status)
+            group_columns = [GROUP_COLUMNS[name] for name in group_by]
             return {
                 "success": True,
-                "pets": pets_data,
-                "people": people_data,
-                "donations": donations_data,
-                "partners": partners_data
+                "from_status": from_status,
+                "to_status": to_status,
+                "overall": (summarize_aggregates(rows, []) or [None])[0],
+                "groups": summarize_aggregates(rows, group_columns)
             }, 200
         except Exception as e:
             return {"success": False, "error": f"An error occurred: {str(e)}"}, 500
+
+    @classmethod
+    def get_status_funnel(cls) -> Tuple[Dict, int]:
+        client_id, error_response, status_code = cls.get_client_id()
+        if error_response:
+            return error_response, status_code
+
+        try:
+            rows = fetch_status_aggregates(client_id)
+            return {"success": True, "transitions": summarize_aggregates(rows, ['from_status', 'to_status'])}, 200
+        except Exception as e:
+            return {"success": False, "error": f"An error occurred: {str(e)}"}, 500
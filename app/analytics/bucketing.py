@@ -0,0 +1,101 @@
+from bisect import bisect_left
+from datetime import datetime, timedelta, timezone
+from itertools import accumulate
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+INTERVALS = ('hour', 'day', 'week', 'month', 'year')
+
+# Bucket size used for each dashboard time filter when the caller does not pick one.
+DEFAULT_INTERVALS = {
+    'day': 'hour',
+    'week': 'day',
+    'month': 'day',
+    'year': 'month',
+    'all': 'month'
+}
+
+def parse_time_zone(name):
+    if not name:
+        return timezone.utc
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        raise ValueError(f"Unknown time zone: {name}")
+
+def truncate(moment, interval):
+    """Start of the bucket containing moment, in moment's own time zone."""
+    if interval == 'hour':
+        start = moment.replace(minute=0, second=0, microsecond=0)
+    elif interval == 'day':
+        start = moment.replace(hour=0, minute=0, second=0, microsecond=0)
+    elif interval == 'week':
+        start = moment.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=moment.weekday())
+    elif interval == 'month':
+        start = moment.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    else:
+        start = moment.replace(month=1, day=1, hour=0, minute=0, second=0, microsecond=0)
+    # Rebuilding from wall-clock fields lets zoneinfo pick the right UTC offset across DST changes.
+    return datetime(start.year, start.month, start.day, start.hour, tzinfo=moment.tzinfo)
+
+def next_start(start, interval):
+    if interval == 'hour':
+        # Hours are fixed-length, so step in UTC to get through DST changes cleanly.
+        return (start.astimezone(timezone.utc) + timedelta(hours=1)).astimezone(start.tzinfo)
+    if interval == 'day':
+        day = start.date() + timedelta(days=1)
+    elif interval == 'week':
+        day = start.date() + timedelta(weeks=1)
+    elif interval == 'month':
+        day = (start.replace(day=28) + timedelta(days=4)).replace(day=1).date()
+    else:
+        day = start.date().replace(year=start.year + 1)
+    return datetime(day.year, day.month, day.day, tzinfo=start.tzinfo)
+
+def as_utc(moment):
+    # The app stores and compares naive timestamps as UTC.
+    if moment.tzinfo is None:
+        return moment.replace(tzinfo=timezone.utc)
+    return moment.astimezone(timezone.utc)
+
+class Buckets:
+    """Contiguous time buckets covering a range, with bisect-based counting over sorted data."""
+
+    def __init__(self, start_time, end_time, interval, tz=timezone.utc, max_buckets=None):
+        if interval not in INTERVALS:
+            raise ValueError(f"interval must be one of: {', '.join(INTERVALS)}")
+        self.interval = interval
+        self.tz = tz
+
+        end = as_utc(end_time).astimezone(tz)
+        start = truncate(as_utc(start_time).astimezone(tz), interval)
+        self.starts = []
+        while start <= end:
+            self.starts.append(start)
+            if max_buckets and len(self.starts) > max_buckets:
+                raise ValueError(f"Too many buckets; use a coarser interval than '{interval}' for this range")
+            start = next_start(start, interval)
+        self.edges = [bucket_start.timestamp() for bucket_start in self.starts] + [start.timestamp()]
+
+    def label(self, bucket_start):
+        if self.interval == 'hour':
+            return bucket_start.strftime("%Y-%m-%dT%H:00")
+        return bucket_start.strftime("%Y-%m-%d")
+
+    @property
+    def labels(self):
+        return [self.label(bucket_start) for bucket_start in self.starts]
+
+    def count_sorted(self, timestamps, weights=None):
+        """Count sorted POSIX timestamps per bucket (optionally weighted) with one bisect per edge."""
+        positions = [bisect_left(timestamps, edge) for edge in self.edges]
+        if weights is None:
+            return [end - start for start, end in zip(positions, positions[1:])]
+        totals = [0, *accumulate(weights)]
+        return [totals[end] - totals[start] for start, end in zip(positions, positions[1:])]
+
+    def count_labels(self, counts_by_label):
+        """Align counts already bucketed elsewhere (e.g. by the database) to these buckets."""
+        return [counts_by_label.get(label, 0) for label in self.labels]
+
+    def series(self, counts):
+        return [{"date": label, "count": count} for label, count in zip(self.labels, counts)]
@@ -0,0 +1,110 @@
+import math
+from collections import Counter
+from datetime import datetime, timezone
+from flask import current_app
+from app.config import Config
+from app.analytics.bucketing import as_utc
+
+# Log-bucketed quantile sketch: every duration lands in bucket ceil(log_gamma(seconds)), so a
+# quantile read back from the buckets is within SKETCH_RELATIVE_ACCURACY of the true value.
+SKETCH_RELATIVE_ACCURACY = 0.02
+SKETCH_GAMMA = (1 + SKETCH_RELATIVE_ACCURACY) / (1 - SKETCH_RELATIVE_ACCURACY)
+SKETCH_LOG_GAMMA = math.log(SKETCH_GAMMA)
+
+QUANTILES = (0.5, 0.75, 0.9, 0.95)
+
+GROUP_COLUMNS = {
+    'type': 'pet_type',
+    'breed': 'pet_breed'
+}
+
+SECONDS_PER_DAY = 86400
+
+def sketch_index(seconds):
+    return math.ceil(math.log(max(seconds, 1.0)) / SKETCH_LOG_GAMMA)
+
+def sketch_value(index):
+    # Midpoint (in relative terms) of the bucket (gamma^(i-1), gamma^i].
+    return 2 * SKETCH_GAMMA ** index / (SKETCH_GAMMA + 1)
+
+def sketch_quantiles(sketch, quantiles=QUANTILES):
+    buckets = sorted((int(index), count) for index, count in sketch.items() if count > 0)
+    total = sum(count for _, count in buckets)
+    if not total:
+        return {q: None for q in quantiles}
+
+    results = {}
+    for q in quantiles:
+        rank = q * (total - 1)
+        seen = 0
+        for index, count in buckets:
+            seen += count
+            if seen > rank:
+                results[q] = sketch_value(index)
+                break
+    return results
+
+def record_status_transition(supabase_client, before, to_status):
+    """Log a pet_status change and fold its length of stay into the running aggregates.
+
+    before is the pet row as it was prior to the update. The stay is measured from intake
+    (created_at) to now.
+    """
+    stay_seconds = max((datetime.now(timezone.utc) - as_utc(datetime.fromisoformat(before['created_at']))).total_seconds(), 0.0)
+    supabase_client.rpc('record_pet_status_transition', {
+        'p_client_id': str(before['client_id']),
+        'p_pet_id': str(before['pet_id']),
+        'p_from_status': before.get('pet_status') or '',
+        'p_to_status': to_status,
+        'p_pet_type': before.get('pet_type'),
+        'p_pet_breed': before.get('pet_breed'),
+        'p_stay_seconds': stay_seconds,
+        'p_sketch_index': sketch_index(stay_seconds)
+    }).execute()
+
+def fetch_status_aggregates(client_id, from_status=None, to_status=None):
+    rows = []
+    offset = 0
+    while True:
+        query = current_app.supabase.table('pet_status_aggregates').select('*').eq('client_id', str(client_id))
+        if from_status:
+            query = query.eq('from_status', from_status)
+        if to_status:
+            query = query.eq('to_status', to_status)
+        response = query.order('pet_type').order('pet_breed').range(offset, offset + Config.EXPORT_PAGE_SIZE - 1).execute()
+        page = response.data or []
+        rows.extend(page)
+        if len(page) < Config.EXPORT_PAGE_SIZE:
+            return rows
+        offset += Config.EXPORT_PAGE_SIZE
+
+def summarize_aggregates(rows, group_columns):
+    """Merge aggregate rows by group_columns and turn each group into day-based stats."""
+    groups = {}
+    for row in rows:
+        key = tuple(row[column] for column in group_columns)
+        group = groups.setdefault(key, {"transitions": 0, "total_seconds": 0.0, "min": None, "max": None, "sketch": Counter()})
+        group["transitions"] += row['transitions']
+        group["total_seconds"] += row['total_seconds']
+        if row.get('min_seconds') is not None:
+            group["min"] = row['min_seconds'] if group["min"] is None else min(group["min"], row['min_seconds'])
+        if row.get('max_seconds') is not None:
+            group["max"] = row['max_seconds'] if group["max"] is None else max(group["max"], row['max_seconds'])
+        group["sketch"].update(row.get('sketch') or {})
+
+    def days(seconds):
+        return round(seconds / SECONDS_PER_DAY, 2) if seconds is not None else None
+
+    summaries = []
+    for key, group in groups.items():
+        quantiles = sketch_quantiles(group["sketch"])
+        summary = dict(zip(group_columns, key))
+        summary.update({
+            "count": group["transitions"],
+            "avg_days": days(group["total_seconds"] / group["transitions"]) if group["transitions"] else None,
+            "min_days": days(group["min"]),
+            "max_days": days(group["max"]),
+            **{f"p{int(q * 100)}_days": days(value) for q, value in quantiles.items()}
+        })
+        summaries.append(summary)
+    return sorted(summaries, key=lambda summary: summary["count"], reverse=True)
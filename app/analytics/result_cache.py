@@ -0,0 +1,54 @@
+import threading
+from app.cache import TTLCache
+from app.config import Config
+from app.signals import rows_created, rows_updated, rows_deleted
+
+analytics_cache = TTLCache(Config.ANALYTICS_CACHE_SIZE, Config.ANALYTICS_CACHE_TTL, Config.ANALYTICS_CACHE_STALE_TTL)
+
+# Bumped on every invalidation so a refresh that started before a write cannot store
+# a result computed from the old rows.
+generations = {}
+generation_lock = threading.Lock()
+
+refreshing = set()
+refreshing_lock = threading.Lock()
+
+def cache_key(client_id, table, time_filter, interval, tz):
+    return (str(client_id), table, time_filter, interval, str(tz))
+
+def current_generation(client_id, table):
+    with generation_lock:
+        return generations.get((str(client_id), table), 0)
+
+def store_result(key, payload, generation):
+    if current_generation(key[0], key[1]) == generation:
+        analytics_cache.set(key, payload)
+
+def invalidate_analytics(client_id, table):
+    client_id = str(client_id)
+    with generation_lock:
+        generations[(client_id, table)] = generations.get((client_id, table), 0) + 1
+    analytics_cache.discard_where(lambda key: key[0] == client_id and key[1] == table)
+
+def refresh_in_background(key, refresh):
+    """Run refresh() on its own thread unless a refresh for key is already running."""
+    with refreshing_lock:
+        if key in refreshing:
+            return
+        refreshing.add(key)
+
+    def run():
+        try:
+            refresh()
+        finally:
+            with refreshing_lock:
+                refreshing.discard(key)
+
+    threading.Thread(target=run, name='analytics-refresh', daemon=True).start()
+
+@rows_created.connect
+@rows_updated.connect
+@rows_deleted.connect
+def invalidate_written_table(table, rows=None):
+    for client_id in {row.get('client_id') for row in rows or [] if row.get('client_id')}:
+        invalidate_analytics(client_id, table)
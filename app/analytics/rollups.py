@@ -0,0 +1,87 @@
+import click
+from collections import Counter
+from datetime import datetime, timezone
+from flask import current_app
+from flask.cli import AppGroup
+from app.config import Config
+from app.signals import rows_created, rows_deleted
+
+ROLLUP_TABLES = ('pets', 'people', 'donations', 'partners')
+
+rollups_cli = AppGroup('rollups', help="Maintain the analytics daily rollup table.")
+
+def created_day(created_at):
+    created = datetime.fromisoformat(created_at)
+    if created.tzinfo is not None:
+        created = created.astimezone(timezone.utc)
+    return created.date().isoformat()
+
+def bump_rollups(table, rows, sign):
+    """Add sign * (rows per client and day) to the rollup table in one RPC call.
+
+    A failed bump is logged rather than raised: the write it follows has already
+    succeeded, and `flask rollups rebuild` repairs any drift. Does nothing unless
+    ANALYTICS_MAINTAIN_ROLLUPS is set, so writes make no extra round trip by default.
+    """
+    if not Config.ANALYTICS_MAINTAIN_ROLLUPS or table not in ROLLUP_TABLES or not rows:
+        return
+    try:
+        deltas = Counter(
+            (str(row['client_id']), created_day(row['created_at']))
+            for row in rows if row.get('client_id') and row.get('created_at')
+        )
+        if not deltas:
+            return
+        current_app.supabase.rpc('bump_analytics_rollups', {
+            'p_table': table,
+            'p_deltas': [
+                {"client_id": client_id, "day": day, "delta": sign * count}
+                for (client_id, day), count in deltas.items()
+            ]
+        }).execute()
+    except Exception as e:
+        current_app.logger.error(f"Failed to update analytics rollups for {table}: {str(e)}")
+
+@rows_created.connect
+def count_created_rows(table, rows=None):
+    bump_rollups(table, rows, 1)
+
+@rows_deleted.connect
+def count_deleted_rows(table, rows=None):
+    bump_rollups(table, rows, -1)
+
+def fetch_rollup_counts(client_id, table, start_day, end_day):
+    """Return {day: count} for start_day..end_day (inclusive ISO dates) from the rollup table."""
+    counts = {}
+    offset = 0
+    while True:
+        response = current_app.supabase.table('analytics_daily_rollups') \
+            .select('day,row_count') \
+            .eq('client_id', str(client_id)) \
+            .eq('table_name', table) \
+            .gte('day', start_day) \
+            .lte('day', end_day) \
+            .order('day') \
+            .range(offset, offset + Config.EXPORT_PAGE_SIZE - 1) \
+            .execute()
+        rows = response.data or []
+        for row in rows:
+            counts[row['day']] = row['row_count']
+        if len(rows) < Config.EXPORT_PAGE_SIZE:
+            return counts
+        offset += Config.EXPORT_PAGE_SIZE
+
+@rollups_cli.command('rebuild')
+@click.option('--table', 'tables', multiple=True, type=click.Choice(ROLLUP_TABLES), help="Table to rebuild (repeatable). Defaults to all.")
+@click.option('--client-id', default=None, help="Only rebuild this client's rollups.")
+def rebuild_rollups(tables, client_id):
+    """Recompute the daily rollups from the source tables."""
+    for table in tables or ROLLUP_TABLES:
+        response = current_app.supabase.rpc('rebuild_analytics_rollups', {
+            'p_table': table,
+            'p_client_id': client_id
+        }).execute()
+        click.echo(f"{table}: {response.data} day rows rebuilt")
+
+def init_rollups(app):
+    app.cli.add_command(rollups_cli)
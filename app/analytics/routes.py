@@ -21,6 +21,14 @@ def get_people_analytics(time_filter):
 def get_partners_analytics(time_filter):
     return AnalyticsService.get_partners_by_time(time_filter)
 
+@analytics_bp.route('/analytics/length-of-stay', methods=['GET'])
+def get_length_of_stay_analytics():
+    return AnalyticsService.get_length_of_stay()
+
+@analytics_bp.route('/analytics/status-funnel', methods=['GET'])
+def get_status_funnel_analytics():
+    return AnalyticsService.get_status_funnel()
+
 @analytics_bp.route('/analytics/all/<time_filter>', methods=['GET'])
 def get_all_analytics(time_filter):
     return AnalyticsService.get_all_data(time_filter)
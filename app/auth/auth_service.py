@@ -1,4 +1,13 @@
 from flask import current_app, session
+from app.photos import ingest_photo, PROFILE_PICTURE_VARIANTS
+from app.uploads import spooled_upload
+
+def prepare_profile_picture(file_content):
+    try:
+        derivatives = ingest_photo(file_content, PROFILE_PICTURE_VARIANTS, 'JPEG')
+    except Exception:
+        return file_content
+    return derivatives['profile'][0] if derivatives else file_content
 
 class AuthService:
     def signup(self, email, password, first_name, last_name, profile_pic_file=None):
@@ -19,9 +28,10 @@ class AuthService:
                     try:
                         bucket_name = 'profile-pictures'
                         file_name = f"profile_pic_{user.user.id}.jpg"
-                        file_content = profile_pic_file.read()
-                        
-                        current_app.supabase.storage.from_(bucket_name).upload(file_name, file_content)
+                        with spooled_upload(profile_pic_file) as file_content:
+                            file_content = prepare_profile_picture(file_content)
+                            current_app.supabase.storage.from_(bucket_name).upload(file_name, file_content, {"content-type": "image/jpeg"})
+
                         profile_pic_url = current_app.supabase.storage.from_(bucket_name).get_public_url(file_name)
                         user_metadata['profile_pic'] = profile_pic_url
                         
@@ -132,14 +142,16 @@ class AuthService:
                 try:
                     bucket_name = 'profile-pictures'
                     file_name = f"profile_pic_{user_id}.jpg"
-                    file_content = profile_pic_file.read()
-                    
-                    try:
-                        current_app.supabase.storage.from_(bucket_name).remove([file_name])
-                    except Exception:
-                        pass
-                    
-                    current_app.supabase.storage.from_(bucket_name).upload(file_name, file_content)
+                    with spooled_upload(profile_pic_file) as file_content:
+                        file_content = prepare_profile_picture(file_content)
+
+                        try:
+                            current_app.supabase.storage.from_(bucket_name).remove([file_name])
+                        except Exception:
+                            pass
+
+                        current_app.supabase.storage.from_(bucket_name).upload(file_name, file_content, {"content-type": "image/jpeg"})
+
                     profile_pic_url = current_app.supabase.storage.from_(bucket_name).get_public_url(file_name)
                     metadata_update['profile_pic'] = profile_pic_url
                 except Exception as upload_error:
@@ -1,5 +1,6 @@
 from flask import Blueprint, request, jsonify, Response
 from app.calendar.calendar_functions import EventService
+from app.conditional import conditional_get
 from flask_cors import CORS
 
 event_bp = Blueprint('event_bp', __name__)
@@ -24,6 +25,7 @@ def create_event():
         return jsonify(result), 500
 
 @event_bp.route('/calendar/get-events', methods=['GET'])
+@conditional_get
 def get_events():
     result = event_service.retrieve_events()
     if result['success']:
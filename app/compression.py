@@ -0,0 +1,64 @@
+import gzip
+from flask import request
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/x-ndjson',
+    'text/html',
+    'text/plain',
+    'text/csv',
+    'text/calendar',
+}
+
+def init_compression(app):
+    min_size = app.config['COMPRESSION_MIN_SIZE']
+    gzip_level = app.config['COMPRESSION_GZIP_LEVEL']
+    brotli_quality = app.config['COMPRESSION_BROTLI_QUALITY']
+
+    @app.after_request
+    def compress_response(response):
+        if response.status_code < 200 or response.status_code >= 300 or response.status_code == 204:
+            return response
+        if response.direct_passthrough or response.is_streamed or 'Content-Encoding' in response.headers:
+            return response
+        if response.mimetype not in COMPRESSIBLE_MIMETYPES:
+            return response
+
+        encoding = choose_encoding()
+        if encoding is None:
+            return response
+
+        data = response.get_data()
+        if len(data) < min_size:
+            return response
+
+        if encoding == 'br':
+            data = brotli.compress(data, quality=brotli_quality)
+        else:
+            data = gzip.compress(data, compresslevel=gzip_level)
+
+        response.set_data(data)
+        response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+
+        # The compressed bytes are a different representation of the same payload,
+        # so the ETag computed over the uncompressed body is only weakly valid.
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        return response
+
+def choose_encoding():
+    accept_encodings = request.accept_encodings
+    brotli_quality = accept_encodings['br'] if brotli is not None else 0
+    gzip_quality = accept_encodings['gzip']
+    if brotli_quality and brotli_quality >= gzip_quality:
+        return 'br'
+    if gzip_quality:
+        return 'gzip'
+    return None
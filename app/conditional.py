@@ -0,0 +1,16 @@
+from functools import wraps
+from flask import request, make_response
+
+def conditional_get(view):
+    """Tag successful GET responses with a strong ETag and answer If-None-Match with 304."""
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = make_response(view(*args, **kwargs))
+        if request.method in ('GET', 'HEAD') and response.status_code == 200 and not response.is_streamed:
+            response.add_etag()
+            response.headers['Cache-Control'] = 'private, no-cache'
+            response.vary.add('Cookie')
+            response = response.make_conditional(request)
+        return response
+    return wrapper
@@ -17,11 +17,78 @@ class Config:
     SUPABASE_URL = os.getenv('SUPABASE_URL', 'https://default.supabase.co')
     SUPABASE_ANON_KEY = os.getenv('SUPABASE_ANON_KEY', 'default_anon_key')
     STRIPE_SECRET_KEY = os.getenv('STRIPE_SECRET_KEY', 'default_stripe_key')
+    STRIPE_WEBHOOK_SECRET = os.getenv('STRIPE_WEBHOOK_SECRET')
     OPENAI_API_KEY = os.getenv('OPENAI_API_KEY', 'default_openai_key')
     
     LOGO_URL = "https://vtooxzdgxuoxwgcdzkbd.supabase.co/storage/v1/object/public/logo/pawportallogo.png?t=2024-08-22T18%3A49%3A14.515Z"
     RESEND_API_KEY = os.getenv('RESEND_API_KEY', 'default_resend_key')
 
+    PAGE_SIZE_DEFAULT = int(os.getenv('PAGE_SIZE_DEFAULT', 100))
+    PAGE_SIZE_MAX = int(os.getenv('PAGE_SIZE_MAX', 1000))
+    EXPORT_PAGE_SIZE = int(os.getenv('EXPORT_PAGE_SIZE', 1000))
+
+    RECORD_CACHE_SIZE = int(os.getenv('RECORD_CACHE_SIZE', 2048))
+    RECORD_CACHE_TTL = float(os.getenv('RECORD_CACHE_TTL', 60))
+
+    BATCH_LOOKUP_MAX = int(os.getenv('BATCH_LOOKUP_MAX', 200))
+    BULK_MAX_ITEMS = int(os.getenv('BULK_MAX_ITEMS', 2000))
+    BULK_CHUNK_SIZE = int(os.getenv('BULK_CHUNK_SIZE', 200))
+    INVOICE_BULK_MAX_ITEMS = int(os.getenv('INVOICE_BULK_MAX_ITEMS', 10000))
+
+    COMPRESSION_MIN_SIZE = int(os.getenv('COMPRESSION_MIN_SIZE', 1024))
+    COMPRESSION_GZIP_LEVEL = int(os.getenv('COMPRESSION_GZIP_LEVEL', 6))
+    COMPRESSION_BROTLI_QUALITY = int(os.getenv('COMPRESSION_BROTLI_QUALITY', 4))
+
+    MAX_CONTENT_LENGTH = int(os.getenv('MAX_CONTENT_LENGTH', 100 * 1024 * 1024))
+    UPLOAD_SPOOL_THRESHOLD = int(os.getenv('UPLOAD_SPOOL_THRESHOLD', 1024 * 1024))
+    UPLOAD_CHUNK_SIZE = int(os.getenv('UPLOAD_CHUNK_SIZE', 1024 * 1024))
+
+    SEARCH_INDEX_TTL = float(os.getenv('SEARCH_INDEX_TTL', 600))
+    SEARCH_MAX_TENANTS = int(os.getenv('SEARCH_MAX_TENANTS', 50))
+    SEARCH_MAX_RESULTS = int(os.getenv('SEARCH_MAX_RESULTS', 100))
+    SEARCH_FUZZY_THRESHOLD = float(os.getenv('SEARCH_FUZZY_THRESHOLD', 0.3))
+
+    ANALYTICS_USE_ROLLUPS = os.getenv('ANALYTICS_USE_ROLLUPS', 'false').lower() == 'true'
+    # Keep the rollup table current on every create and delete; on by default once reads use it.
+    ANALYTICS_MAINTAIN_ROLLUPS = os.getenv('ANALYTICS_MAINTAIN_ROLLUPS', str(ANALYTICS_USE_ROLLUPS)).lower() == 'true'
+    ANALYTICS_WORKERS = int(os.getenv('ANALYTICS_WORKERS', 8))
+    ANALYTICS_QUERY_TIMEOUT = float(os.getenv('ANALYTICS_QUERY_TIMEOUT', 30))
+    ANALYTICS_MAX_BUCKETS = int(os.getenv('ANALYTICS_MAX_BUCKETS', 1000))
+    ANALYTICS_CACHE_SIZE = int(os.getenv('ANALYTICS_CACHE_SIZE', 512))
+    ANALYTICS_CACHE_TTL = float(os.getenv('ANALYTICS_CACHE_TTL', 60))
+    # Serve results this many seconds past their TTL while a background refresh runs; 0 disables.
+    ANALYTICS_CACHE_STALE_TTL = float(os.getenv('ANALYTICS_CACHE_STALE_TTL', 0))
+
+    HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', 30))
+    HTTP_POOL_HOSTS = int(os.getenv('HTTP_POOL_HOSTS', 10))
+    HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', 20))
+    HTTP_MAX_RETRIES = int(os.getenv('HTTP_MAX_RETRIES', 2))
+    HTTP_RETRY_BACKOFF = float(os.getenv('HTTP_RETRY_BACKOFF', 0.2))
+    HTTP_RETRY_BUDGET_RATIO = float(os.getenv('HTTP_RETRY_BUDGET_RATIO', 0.1))
+    HTTP_RETRY_BUDGET_MIN = int(os.getenv('HTTP_RETRY_BUDGET_MIN', 10))
+    HTTP_BREAKER_FAILURES = int(os.getenv('HTTP_BREAKER_FAILURES', 5))
+    HTTP_BREAKER_RESET = float(os.getenv('HTTP_BREAKER_RESET', 30))
+
+    # Compiled email templates are written here so new processes skip Jinja's parse and compile step.
+    EMAIL_TEMPLATE_CACHE_DIR = os.getenv('EMAIL_TEMPLATE_CACHE_DIR', os.path.join(os.getcwd(), 'jinja_cache'))
+    EMAIL_TEMPLATE_AUTO_RELOAD = os.getenv('EMAIL_TEMPLATE_AUTO_RELOAD', 'false').lower() == 'true'
+
+    EMAIL_OUTBOX_PATH = os.getenv('EMAIL_OUTBOX_PATH', 'email_outbox.sqlite3')
+    EMAIL_OUTBOX_WORKERS = int(os.getenv('EMAIL_OUTBOX_WORKERS', 2))
+    EMAIL_OUTBOX_BATCH_SIZE = int(os.getenv('EMAIL_OUTBOX_BATCH_SIZE', 100))
+    EMAIL_OUTBOX_MAX_ATTEMPTS = int(os.getenv('EMAIL_OUTBOX_MAX_ATTEMPTS', 8))
+    EMAIL_OUTBOX_BACKOFF = float(os.getenv('EMAIL_OUTBOX_BACKOFF', 5))
+    EMAIL_OUTBOX_BACKOFF_MAX = float(os.getenv('EMAIL_OUTBOX_BACKOFF_MAX', 3600))
+    EMAIL_OUTBOX_POLL_INTERVAL = float(os.getenv('EMAIL_OUTBOX_POLL_INTERVAL', 2))
+    # Messages claimed by a worker that died are handed out again after this many seconds.
+    EMAIL_OUTBOX_CLAIM_TIMEOUT = float(os.getenv('EMAIL_OUTBOX_CLAIM_TIMEOUT', 300))
+
+    PHOTO_FORMAT = os.getenv('PHOTO_FORMAT', 'WEBP')
+    PHOTO_QUALITY = int(os.getenv('PHOTO_QUALITY', 80))
+    PHOTO_WORKERS = int(os.getenv('PHOTO_WORKERS', 2))
+    PHOTO_TIMEOUT = float(os.getenv('PHOTO_TIMEOUT', 30))
+
     @staticmethod
     def init_app(app):
         pass
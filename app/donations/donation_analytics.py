@@ -0,0 +1,131 @@
+import re
+from collections import defaultdict
+from flask import current_app
+from postgrest.exceptions import APIError
+from app.config import Config
+from app.models.pagination import select_page
+
+ANALYTICS_COLUMNS = 'donation_id,person_id,email,title,payment_method_id,payment_status,amount,created_at'
+
+PERCENTILES = {'p25': 0.25, 'p50': 0.5, 'p75': 0.75, 'p90': 0.9, 'p99': 0.99}
+
+def safe_convert_to_int(value):
+    try:
+        return int(value) if value is not None else 0
+    except (ValueError, TypeError):
+        return 0
+
+WHOLE_NUMBER = re.compile(r"-?[0-9]+")
+
+def whole_amount(value):
+    # The rule migrations/005 applies: anything but a plain whole number counts as 0.
+    text = str(value) if value is not None else ''
+    return int(text) if WHOLE_NUMBER.fullmatch(text) else 0
+
+def payment_method(donation):
+    method = donation.get('payment_method_id')
+    if method == 'Cash':
+        return 'cash'
+    if method in (None, 'Pending'):
+        return 'pending'
+    return 'card'
+
+def percentile(sorted_values, fraction):
+    # Linear interpolation between closest ranks, the same as Postgres percentile_cont.
+    if not sorted_values:
+        return None
+    position = fraction * (len(sorted_values) - 1)
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+def breakdown(groups):
+    return sorted(
+        ({"key": key, "total": total, "count": count} for key, (total, count) in groups.items()),
+        key=lambda group: group["total"],
+        reverse=True
+    )
+
+def summarize_donations(donations, start, previous_start, previous_end, top_n):
+    """Compute every donation statistic in a single pass over the rows.
+
+    start, previous_start and previous_end are ISO timestamps; rows on or after start are
+    the current span, rows in [previous_start, previous_end) make up the previous total.
+    """
+    total_amount = 0
+    previous_total = 0
+    amounts = []
+    donors = defaultdict(lambda: {"email": None, "total": 0, "count": 0})
+    by_title = defaultdict(lambda: [0, 0])
+    by_method = defaultdict(lambda: [0, 0])
+    by_status = defaultdict(lambda: [0, 0])
+
+    for donation in donations:
+        amount = whole_amount(donation.get('amount'))
+        created_at = donation['created_at']
+        if previous_start <= created_at < previous_end:
+            previous_total += amount
+        if created_at < start:
+            continue
+
+        total_amount += amount
+        amounts.append(amount)
+        if donation.get('person_id'):
+            donor = donors[donation['person_id']]
+            email = donation.get('email')
+            if email is not None and (donor["email"] is None or email > donor["email"]):
+                donor["email"] = email
+            donor["total"] += amount
+            donor["count"] += 1
+        for groups, key in ((by_title, donation.get('title') or 'No Title'),
+                            (by_method, payment_method(donation)),
+                            (by_status, donation.get('payment_status') or 'Unknown')):
+            groups[key][0] += amount
+            groups[key][1] += 1
+
+    amounts.sort()
+    top_donors = sorted(
+        ({"person_id": person_id, **donor} for person_id, donor in donors.items()),
+        key=lambda donor: donor["total"],
+        reverse=True
+    )[:top_n]
+
+    return {
+        "total_amount": total_amount,
+        "donation_count": len(amounts),
+        "unique_donors": len(donors),
+        "previous_total": previous_total,
+        "percentiles": {name: percentile(amounts, fraction) for name, fraction in PERCENTILES.items()},
+        "top_donors": top_donors,
+        "by_title": breakdown(by_title),
+        "by_payment_method": breakdown(by_method),
+        "by_payment_status": breakdown(by_status)
+    }
+
+def iter_donations(client_id, since):
+    cursor = None
+    while True:
+        query = current_app.supabase.table('donations').select(ANALYTICS_COLUMNS).eq('client_id', client_id).gte('created_at', since)
+        rows, cursor = select_page(query, 'donation_id', Config.EXPORT_PAGE_SIZE, cursor)
+        yield from rows
+        if not cursor:
+            return
+
+def fetch_donation_summary(client_id, start, previous_start, previous_end, top_n):
+    """Summarize donations in the database, or in one streamed pass if the RPC is missing."""
+    try:
+        response = current_app.supabase.rpc('donation_analytics', {
+            'p_client_id': str(client_id),
+            'p_start': start,
+            'p_previous_start': previous_start,
+            'p_previous_end': previous_end,
+            'p_top_n': top_n
+        }).execute()
+        return response.data
+    except APIError as e:
+        # PGRST202: migrations/005 has not been applied yet.
+        if e.code != 'PGRST202':
+            raise
+
+    donations = iter_donations(client_id, min(start, previous_start))
+    return summarize_donations(donations, start, previous_start, previous_end, top_n)
@@ -3,11 +3,14 @@ import stripe
 from datetime import datetime, timedelta
 import uuid
 from app.models.people_model import PeopleModel
-from app.email_utils import (
-    send_payment_confirmation_email,
-    generate_invoice_html,
-    send_invoice_email_via_resend
-)
+from app.signals import rows_created, rows_updated, rows_deleted
+from app.config import Config
+from app.models.pagination import select_page, parse_limit, decode_cursor
+from app.donations.donation_analytics import fetch_donation_summary, safe_convert_to_int
+from app.donations.donation_summary import get_donation_summary
+from app.models.bulk import chunked, canonical_uuid, item_result, write_in_chunks, summarize
+from app.email_utils import generate_invoice_html, generate_invoice_emails, invoice_subject
+from app.email_outbox import enqueue_email, enqueue_emails
 
 def get_client_id():
     client_id = session.get('user_id')
@@ -15,6 +18,43 @@ def get_client_id():
         return None, jsonify({"success": False, "error": "Client not logged in"}), 401
     return client_id, None, None
 
+def create_payment_intent(donation_id, client_id, amount, currency, payment_method_id, title, description, first_name=''):
+    # The idempotency key makes a retried request return the original intent instead of
+    # charging again; the metadata lets the webhook find the donation to finalize.
+    return stripe.PaymentIntent.create(
+        amount=amount,
+        currency=currency,
+        payment_method=payment_method_id,
+        confirmation_method="manual",
+        confirm=True,
+        description=f"{title}: {description}",
+        return_url="https://your-website.com/payment-complete",
+        metadata={'donation_id': str(donation_id), 'client_id': str(client_id), 'first_name': first_name or ''},
+        idempotency_key=f"donation-{donation_id}-{payment_method_id}"
+    )
+
+def payment_intent_response(payment_intent, donation_id):
+    """Answer the donation request from the intent alone.
+
+    The donation row and the receipt email are finalized by the Stripe webhook
+    (see app/donations/webhooks.py), so nothing else happens in the request.
+    """
+    if payment_intent.status == "requires_action":
+        return jsonify({
+            'requires_action': True,
+            'payment_intent_client_secret': payment_intent.client_secret,
+            'return_url': payment_intent.next_action.redirect_to_url.url
+        }), 200
+    elif payment_intent.status in ("succeeded", "processing"):
+        return jsonify({
+            'success': True,
+            'message': 'Donation payment successful' if payment_intent.status == "succeeded" else 'Donation payment is processing',
+            'donation_id': donation_id,
+            'payment_status': payment_intent.status
+        }), 200
+    else:
+        return jsonify({'error': 'Payment failed'}), 400
+
 def process_credit_donation(donation_id, payment_method_id):
     client_id, error_response, status_code = get_client_id()
     if error_response:
@@ -31,41 +71,9 @@ def process_credit_donation(donation_id, payment_method_id):
         currency = donation['currency']
         title = donation.get('title', 'Donation')
         description = donation.get('description', '')
-        to_email = donation.get('email')
-
-        payment_intent = stripe.PaymentIntent.create(
-            amount=amount,
-            currency=currency,
-            payment_method=payment_method_id,
-            confirmation_method="manual",
-            confirm=True,
-            description=f"{title}: {description}",
-            return_url="https://your-website.com/payment-complete"
-        )
-
-        if payment_intent.status == "requires_action":
-            return jsonify({
-                'requires_action': True,
-                'payment_intent_client_secret': payment_intent.client_secret,
-                'return_url': payment_intent.next_action.redirect_to_url.url
-            }), 200
-        elif payment_intent.status == "succeeded":
-            current_app.supabase.table('donations').update({
-                'payment_method_id': payment_method_id,
-                'payment_status': 'Succeeded',
-                'stripe_payment_intent_id': payment_intent.id
-            }).eq('donation_id', donation_id).execute()
-
-            first_name = donation.get('first_name', '')
-            send_payment_confirmation_email(to_email, first_name, amount, title)
 
-            return jsonify({
-                'success': True,
-                'message': 'Donation payment successful',
-                'donation_id': donation_id
-            }), 200
-        else:
-            return jsonify({'error': 'Payment failed'}), 400
+        payment_intent = create_payment_intent(donation_id, client_id, amount, currency, payment_method_id, title, description, donation.get('first_name', ''))
+        return payment_intent_response(payment_intent, donation_id)
 
     except stripe.error.CardError as e:
         return jsonify({'error': str(e)}), 400
@@ -89,7 +97,7 @@ def process_credit_donation_auto(data):
             return jsonify({'error': 'Required fields are missing: amount, payment_method_id, email'}), 400
 
         donation_id = str(uuid.uuid4())
-        current_app.supabase.table('donations').insert({
+        response = current_app.supabase.table('donations').insert({
             'donation_id': donation_id,
             'client_id': client_id,
             'amount': amount,
@@ -101,40 +109,10 @@ def process_credit_donation_auto(data):
             'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
             'email': to_email,
         }).execute()
+        rows_created.send('donations', rows=response.data)
 
-        payment_intent = stripe.PaymentIntent.create(
-            amount=amount,
-            currency=currency,
-            payment_method=payment_method_id,
-            confirmation_method="manual",
-            confirm=True,
-            description=f"{title}: {description}",
-            return_url="https://your-website.com/payment-complete"
-        )
-
-        if payment_intent.status == "requires_action":
-            return jsonify({
-                'requires_action': True,
-                'payment_intent_client_secret': payment_intent.client_secret,
-                'return_url': payment_intent.next_action.redirect_to_url.url
-            }), 200
-        elif payment_intent.status == "succeeded":
-            current_app.supabase.table('donations').update({
-                'payment_method_id': payment_method_id,
-                'payment_status': 'Succeeded',
-                'stripe_payment_intent_id': payment_intent.id
-            }).eq('donation_id', donation_id).execute()
-
-            first_name = data.get('first_name', '')
-            send_payment_confirmation_email(to_email, first_name, amount, title)
-
-            return jsonify({
-                'success': True,
-                'message': 'Donation payment successful',
-                'donation_id': donation_id
-            }), 200
-        else:
-            return jsonify({'error': 'Payment failed'}), 400
+        payment_intent = create_payment_intent(donation_id, client_id, amount, currency, payment_method_id, title, description, data.get('first_name', ''))
+        return payment_intent_response(payment_intent, donation_id)
 
     except stripe.error.CardError as e:
         return jsonify({'error': str(e)}), 400
@@ -148,32 +126,23 @@ def get_all_donations():
         return error_response, status_code
 
     try:
-        response = current_app.supabase.table('donations').select('*').eq('client_id', client_id).in_('payment_status', ['Pending', 'Succeeded']).execute()
-
-        if response.data:
-            donations = response.data
-
-            pending_donations = [donation for donation in donations if donation['payment_status'] == 'Pending']
-            successful_donations = [donation for donation in donations if donation['payment_status'] == 'Succeeded']
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            decode_cursor(cursor)
+    except ValueError as e:
+        return jsonify({'success': False, 'message': str(e)}), 400
 
-            pending_count = len(pending_donations)
-            successful_count = len(successful_donations)
-            pending_total_amount = sum(float(donation['amount']) for donation in pending_donations)
-            successful_total_amount = sum(float(donation['amount']) for donation in successful_donations)
+    try:
+        query = current_app.supabase.table('donations').select('*').eq('client_id', client_id).in_('payment_status', ['Pending', 'Succeeded'])
+        donations, next_cursor = select_page(query, 'donation_id', limit or Config.PAGE_SIZE_DEFAULT, cursor)
 
+        if donations or cursor:
             return jsonify({
                 'success': True,
                 'data': donations,
-                'summary': {
-                    'pending': {
-                        'count': pending_count,
-                        'total_amount': pending_total_amount
-                    },
-                    'successful': {
-                        'count': successful_count,
-                        'total_amount': successful_total_amount
-                    }
-                }
+                'next_cursor': next_cursor,
+                'summary': get_donation_summary(client_id)
             }), 200
         else:
             return jsonify({'success': False, 'message': 'No pending or successful donations found for this client.'}), 404
@@ -182,6 +151,29 @@ def get_all_donations():
         return jsonify({'success': False, 'message': f'An error occurred while fetching donations: {str(e)}'}), 500
 
 
+def invoice_url(donation_id):
+    return f"https://127.0.0.1:3000/invoice/{donation_id}"
+
+def invoice_row(donation_id, client_id, person, amount, title, description):
+    return {
+        'donation_id': donation_id,
+        'person_id': person['person_id'],
+        'client_id': client_id,
+        'amount': amount,
+        'currency': 'usd',
+        'title': title,
+        'description': description,
+        'payment_method_id': 'Pending',
+        'payment_status': 'Pending',
+        'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
+        'email': person.get('person_email'),
+        'phone_number': person.get('person_phone'),
+        'address': person.get('person_address'),
+        'zipcode': person.get('person_zipcode'),
+        'city': person.get('person_city'),
+        'state': person.get('person_state')
+    }
+
 def create_invoice(data):
     client_id, error_response, status_code = get_client_id()
     if error_response:
@@ -197,56 +189,116 @@ def create_invoice(data):
         return jsonify({'success': False, 'message': 'Required fields are missing'}), 400
 
     try:
-        person_details_response = people_model.get_person_by_id(customer_id)
+        person_details_response = people_model.get_person_by_id(customer_id, client_id)
         if not person_details_response['success']:
             return jsonify({'success': False, 'message': 'Failed to retrieve person details'}), 400
 
-        email = person_details_response['data'].get('person_email')
-        phone = person_details_response['data'].get('person_phone')
-        address = person_details_response['data'].get('person_address')
-        zipcode = person_details_response['data'].get('person_zipcode')
-        city = person_details_response['data'].get('person_city')
-        state = person_details_response['data'].get('person_state')
+        person = person_details_response['data']
+        email = person.get('person_email')
+        phone = person.get('person_phone')
 
         if not email or not phone:
             return jsonify({'success': False, 'message': 'Email or phone number is missing for this person'}), 400
 
         donation_id = str(uuid.uuid4())
-        response = current_app.supabase.table('donations').insert({
-            'donation_id': donation_id,
-            'person_id': customer_id,
-            'client_id': client_id,
-            'amount': amount,
-            'currency': 'usd',
-            'title': title,
-            'description': description,
-            'payment_method_id': 'Pending',
-            'payment_status': 'Pending',
-            'created_at': datetime.utcnow().isoformat(timespec='seconds') + 'Z',
-            'email': email,
-            'phone_number': phone,
-            'address': address,
-            'zipcode': zipcode,
-            'city': city,
-            'state': state
-        }).execute()
+        response = current_app.supabase.table('donations').insert(
+            invoice_row(donation_id, client_id, {**person, 'person_id': customer_id}, amount, title, description)
+        ).execute()
+        rows_created.send('donations', rows=response.data)
 
         if not response.data:
             return jsonify({'success': False, 'message': 'Failed to create donation entry'}), 500
 
-        confirmation_url = f"https://127.0.0.1:3000/invoice/{donation_id}"
-        html_content = generate_invoice_html(title, amount, confirmation_url)
+        html_content = generate_invoice_html(title, amount, invoice_url(donation_id))
 
-        email_status = send_invoice_email_via_resend(email, f"Your {title} Invoice from Paw Portal", html_content)
-
-        if not email_status:
-            current_app.logger.error(f"Failed to send invoice email to {email} for donation ID {donation_id}")
+        enqueue_email(email, invoice_subject(title), html_content)
 
         return jsonify({'success': True, 'invoice_id': donation_id}), 201
 
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+def create_invoices_bulk(data):
+    """Create one invoice per entry in data['invoices'] and queue all their emails.
+
+    Entries may leave out amount, title and description to use the top-level values.
+    People are fetched with chunked in_() lookups, donations are inserted a chunk at a
+    time and the emails are queued in a single outbox write.
+    """
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    invoices = data.get('invoices')
+    if not isinstance(invoices, list) or not invoices:
+        return jsonify({'success': False, 'message': "'invoices' must be a non-empty list"}), 400
+    if len(invoices) > Config.INVOICE_BULK_MAX_ITEMS:
+        return jsonify({'success': False, 'message': f"At most {Config.INVOICE_BULK_MAX_ITEMS} invoices can be sent at once"}), 400
+
+    try:
+        results = []
+        requested = []
+        for index, invoice in enumerate(invoices):
+            invoice = {**{key: data.get(key) for key in ('amount', 'title', 'description')}, **invoice} if isinstance(invoice, dict) else {}
+            missing_fields = [field for field in ('customer_id', 'amount', 'title', 'description') if not invoice.get(field)]
+            if missing_fields:
+                results.append(item_result(index, None, f"Missing fields: {', '.join(missing_fields)}"))
+            elif not canonical_uuid(invoice['customer_id']):
+                results.append(item_result(index, None, "customer_id must be a valid id"))
+            else:
+                requested.append((index, {**invoice, 'customer_id': canonical_uuid(invoice['customer_id'])}))
+
+        people_model = PeopleModel(current_app.supabase)
+        people = {}
+        for chunk in chunked(list({invoice['customer_id'] for _, invoice in requested}), Config.BULK_CHUNK_SIZE):
+            lookup = people_model.get_people_by_ids(chunk, client_id)
+            if not lookup['success']:
+                return jsonify({'success': False, 'message': lookup['message']}), 500
+            people.update(lookup['data'])
+
+        entries = []
+        for index, invoice in requested:
+            person = people.get(invoice['customer_id'])
+            if not person:
+                results.append(item_result(index, None, "Person not found"))
+            elif not person.get('person_email') or not person.get('person_phone'):
+                results.append(item_result(index, None, "Email or phone number is missing for this person"))
+            else:
+                entries.append((index, invoice_row(str(uuid.uuid4()), client_id, person, invoice['amount'], invoice['title'], invoice['description'])))
+
+        def insert_chunk(rows):
+            response = current_app.supabase.table('donations').insert(rows).execute()
+            rows_created.send('donations', rows=response.data)
+
+        written = write_in_chunks(insert_chunk, entries, 'donation_id', Config.BULK_CHUNK_SIZE)
+        results.extend(written)
+
+        created = {result['id'] for result in written if result['success']}
+        rows = [row for _, row in entries if row['donation_id'] in created]
+        # The donations exist from here on, so a failure to queue their emails is reported
+        # per invoice instead of as a 500 that would make the client create them again.
+        email_error = None
+        try:
+            enqueue_emails(generate_invoice_emails(
+                (row['email'], row['title'], row['amount'], invoice_url(row['donation_id'])) for row in rows
+            ))
+        except Exception as e:
+            email_error = f"Invoice created but its email could not be queued: {str(e)}"
+            current_app.logger.error(f"Failed to queue {len(rows)} invoice emails: {str(e)}")
+
+        summary = summarize(results)
+        for result in summary['results']:
+            invoice = invoices[result['index']]
+            result['customer_id'] = invoice.get('customer_id') if isinstance(invoice, dict) else None
+            if result['id'] in created:
+                result['email_queued'] = email_error is None
+                if email_error:
+                    result['email_error'] = email_error
+        return jsonify(summary), 200
+
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 def process_cash_donation(data):
     client_id, error_response, status_code = get_client_id()
     if error_response:
@@ -262,7 +314,7 @@ def process_cash_donation(data):
         return jsonify({'success': False, 'message': 'Required fields are missing'}), 400
 
     try:
-        person_details_response = people_model.get_person_by_id(person_id)
+        person_details_response = people_model.get_person_by_id(person_id, client_id)
         if not person_details_response['success']:
             return jsonify({'success': False, 'message': 'Failed to retrieve person details'}), 400
 
@@ -292,6 +344,7 @@ def process_cash_donation(data):
             'city': city,
             'state': state
         }).execute()
+        rows_created.send('donations', rows=response.data)
 
         if not response.data:
             return jsonify({'success': False, 'message': 'Failed to record cash donation'}), 500
@@ -326,51 +379,54 @@ def get_donation_analytics():
         else:
             return jsonify({'success': False, 'message': 'Invalid span parameter. Use "d", "w", "m", or "y"'}), 400
 
-        supabase_client = current_app.supabase
-        donations_response = supabase_client.table('donations').select('*').eq('client_id', client_id).gte('created_at', start_date.isoformat()).execute()
-
-        donations = donations_response.data
-        if not donations:
-            return jsonify({'success': False, 'message': 'No donations found for the specified period'}), 404
-
-        def safe_convert_to_int(value):
-            try:
-                return int(value) if value is not None else 0
-            except (ValueError, TypeError):
-                return 0
-
-        total_amount = sum(safe_convert_to_int(donation['amount']) for donation in donations)
-        unique_donors = len(set(donation['person_id'] for donation in donations))
+        try:
+            top_n = min(max(int(request.args.get('top', 10)), 1), 100)
+            limit = parse_limit(request.args.get('limit'))
+            cursor = request.args.get('cursor') or None
+            if cursor:
+                decode_cursor(cursor)
+        except ValueError as e:
+            return jsonify({'success': False, 'message': str(e)}), 400
 
         first_day_of_current_month = today.replace(day=1)
         last_day_of_previous_month = first_day_of_current_month - timedelta(days=1)
         first_day_of_previous_month = last_day_of_previous_month.replace(day=1)
 
-        previous_month_response = supabase_client.table('donations').select('amount').eq('client_id', client_id).gte('created_at', first_day_of_previous_month.isoformat()).lte('created_at', last_day_of_previous_month.isoformat()).execute()
-        previous_month_donations = previous_month_response.data
-        previous_total = sum(safe_convert_to_int(donation['amount']) for donation in previous_month_donations)
+        summary = fetch_donation_summary(
+            client_id,
+            start_date.isoformat(),
+            first_day_of_previous_month.isoformat(),
+            first_day_of_current_month.isoformat(),
+            top_n
+        )
+        if not summary['donation_count']:
+            return jsonify({'success': False, 'message': 'No donations found for the specified period'}), 404
 
+        total_amount = summary['total_amount']
+        previous_total = summary.pop('previous_total')
         percentage_change = ((total_amount - previous_total) / previous_total * 100) if previous_total else 0
 
-        donations_results = [{
-            'donation_id': donation['donation_id'],
-            'amount': safe_convert_to_int(donation['amount']),
-            'donor_name': f"{donation.get('first_name', '')} {donation.get('last_name', '')}".strip(),
-            'payment_status': donation.get('payment_status', 'Unknown'),
-            'title': donation.get('title', 'No Title'),
-            'description': donation.get('description', 'No Description'),
-            'created_at': donation['created_at']
-        } for donation in donations]
-
-        return jsonify({
+        result = {
             'success': True,
-            'analytics': {
-                'total_amount': total_amount,
-                'unique_donors': unique_donors,
-                'percentage_change': percentage_change,
-            },
-            'donations': donations_results
-        }), 200
+            'analytics': {**summary, 'percentage_change': percentage_change}
+        }
+
+        # The per-donation list is opt-in and paginated rather than always attached.
+        if 'donations' in request.args.get('include', '').split(','):
+            query = current_app.supabase.table('donations').select('*').eq('client_id', client_id).gte('created_at', start_date.isoformat())
+            donations, next_cursor = select_page(query, 'donation_id', limit or Config.PAGE_SIZE_DEFAULT, cursor)
+            result['donations'] = [{
+                'donation_id': donation['donation_id'],
+                'amount': safe_convert_to_int(donation['amount']),
+                'donor_name': f"{donation.get('first_name', '')} {donation.get('last_name', '')}".strip(),
+                'payment_status': donation.get('payment_status', 'Unknown'),
+                'title': donation.get('title', 'No Title'),
+                'description': donation.get('description', 'No Description'),
+                'created_at': donation['created_at']
+            } for donation in donations]
+            result['next_cursor'] = next_cursor
+
+        return jsonify(result), 200
 
     except Exception as e:
         return jsonify({'success': False, 'message': f'An error occurred while fetching donation analytics: {str(e)}'}), 500
@@ -384,6 +440,7 @@ def delete_donation(donation_id):
 
     try:
         response = current_app.supabase.table('donations').delete().eq('donation_id', str(donation_id)).eq('client_id', client_id).execute()
+        rows_deleted.send('donations', rows=response.data)
 
         if response.data:
             return jsonify({'success': True, 'message': 'Donation deleted successfully'}), 200
@@ -418,6 +475,7 @@ def update_donation(donation_id, data):
                 update_data['state'] = billing_details['address'].get('state')
 
         response = current_app.supabase.table('donations').update(update_data).eq('donation_id', str(donation_id)).execute()
+        rows_updated.send('donations', rows=response.data)
 
         if response.data:
             return jsonify({"success": True, "message": "Donation updated successfully", "data": response.data}), 200
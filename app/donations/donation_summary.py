@@ -0,0 +1,74 @@
+from flask import current_app
+from postgrest.exceptions import APIError
+from app.config import Config
+from app.models.pagination import select_page
+
+# The keys the /donations summary has always reported, by payment_status.
+SUMMARY_STATUSES = {
+    'Pending': 'pending',
+    'Succeeded': 'successful'
+}
+
+def parse_amount(value):
+    try:
+        return float(value) if value is not None else 0.0
+    except (ValueError, TypeError):
+        return 0.0
+
+def aggregate_donations(client_id):
+    """Count and total every donation of a client by status and currency in one streamed pass."""
+    totals = {}
+    cursor = None
+    while True:
+        query = current_app.supabase.table('donations').select('donation_id,payment_status,currency,amount,created_at').eq('client_id', client_id)
+        rows, cursor = select_page(query, 'donation_id', Config.EXPORT_PAGE_SIZE, cursor)
+        for row in rows:
+            key = (row.get('payment_status') or 'Unknown', (row.get('currency') or 'usd').lower())
+            entry = totals.setdefault(key, [0, 0.0])
+            entry[0] += 1
+            entry[1] += parse_amount(row.get('amount'))
+        if not cursor:
+            break
+    return [
+        {"payment_status": status, "currency": currency, "donation_count": count, "total_amount": total}
+        for (status, currency), (count, total) in totals.items()
+    ]
+
+def fetch_summary_rows(client_id):
+    """Read the trigger-maintained running totals, or aggregate the rows if they are missing."""
+    try:
+        response = current_app.supabase.table('donation_summaries') \
+            .select('payment_status,currency,donation_count,total_amount') \
+            .eq('client_id', str(client_id)) \
+            .execute()
+        return response.data or []
+    except APIError as e:
+        # PGRST205 / 42P01: migrations/006 has not been applied yet.
+        if e.code not in ('PGRST205', '42P01'):
+            raise
+    return aggregate_donations(client_id)
+
+def build_summary(rows):
+    summary = {name: {"count": 0, "total_amount": 0.0} for name in SUMMARY_STATUSES.values()}
+    by_status = {}
+    for row in rows:
+        count = int(row['donation_count'])
+        total = parse_amount(row['total_amount'])
+        if not count:
+            continue
+
+        name = SUMMARY_STATUSES.get(row['payment_status'])
+        if name:
+            summary[name]["count"] += count
+            summary[name]["total_amount"] += total
+
+        status = by_status.setdefault(row['payment_status'], {"count": 0, "total_amount": 0.0, "by_currency": {}})
+        status["count"] += count
+        status["total_amount"] += total
+        status["by_currency"][row['currency']] = {"count": count, "total_amount": total}
+
+    summary["by_status"] = by_status
+    return summary
+
+def get_donation_summary(client_id):
+    return build_summary(fetch_summary_rows(client_id))
@@ -6,10 +6,13 @@ from app.donations.donation_service import (
     delete_donation,
     update_donation,
     create_invoice,
+    create_invoices_bulk,
     get_all_donations,
     process_credit_donation_auto,
     get_donation_info
 )
+from app.donations.webhooks import handle_stripe_webhook
+from app.conditional import conditional_get
 from flask_cors import CORS
 
 donation_bp = Blueprint('donation_bp', __name__)
@@ -25,6 +28,10 @@ def credit_donation():
     payment_method_id = data['payment_method_id']
     return process_credit_donation(donation_id, payment_method_id)
 
+@donation_bp.route('/stripe/webhook', methods=['POST'])
+def stripe_webhook():
+    return handle_stripe_webhook()
+
 @donation_bp.route('/donate/cash', methods=['POST'])
 def cash_donation():
     data = request.json
@@ -56,6 +63,14 @@ def create_invoice_route():
 
     return create_invoice(data)
 
+@donation_bp.route('/create_invoices/bulk', methods=['POST'])
+def create_invoices_bulk_route():
+    data = request.json
+    if not data or 'invoices' not in data:
+        return jsonify({'success': False, 'message': 'Required fields are missing: invoices'}), 400
+
+    return create_invoices_bulk(data)
+
 @donation_bp.route('/donate/credit/auto', methods=['POST'])
 def credit_donation_auto():
     data = request.json
@@ -65,9 +80,11 @@ def credit_donation_auto():
     return process_credit_donation_auto(data)
 
 @donation_bp.route('/donations', methods=['GET'])
+@conditional_get
 def get_all_donations_route():
     return get_all_donations()
 
 @donation_bp.route('/donation/<uuid:donation_id>', methods=['GET'])
+@conditional_get
 def get_donation_info_route(donation_id):
     return get_donation_info(donation_id)
\ No newline at end of file
@@ -0,0 +1,73 @@
+import stripe
+from flask import jsonify, current_app, request
+from app.config import Config
+from app.signals import rows_updated
+from app.email_utils import payment_confirmation_email
+from app.email_outbox import enqueue_email
+
+def finalize_donation(payment_intent, fields):
+    """Apply fields to the intent's donation unless it has already succeeded.
+
+    Stripe delivers events at least once, so the guard on payment_status makes a
+    redelivered event a no-op. A bare neq would also skip rows whose status is still
+    NULL, hence the is.null branch. Returns the updated rows (empty when nothing changed).
+    """
+    donation_id = (payment_intent.get('metadata') or {}).get('donation_id')
+    if not donation_id:
+        return []
+
+    response = current_app.supabase.table('donations').update(fields)\
+        .eq('donation_id', donation_id)\
+        .or_('payment_status.is.null,payment_status.neq.Succeeded')\
+        .execute()
+    if response.data:
+        rows_updated.send('donations', rows=response.data)
+    return response.data or []
+
+def handle_payment_succeeded(payment_intent):
+    rows = finalize_donation(payment_intent, {
+        'payment_method_id': payment_intent.get('payment_method'),
+        'payment_status': 'Succeeded',
+        'stripe_payment_intent_id': payment_intent['id']
+    })
+    for donation in rows:
+        if donation.get('email'):
+            first_name = (payment_intent.get('metadata') or {}).get('first_name', '')
+            enqueue_email(donation['email'], *payment_confirmation_email(first_name, donation['amount'], donation.get('title', 'Donation')))
+
+def handle_payment_failed(payment_intent):
+    finalize_donation(payment_intent, {
+        'payment_status': 'Failed',
+        'stripe_payment_intent_id': payment_intent['id']
+    })
+
+EVENT_HANDLERS = {
+    'payment_intent.succeeded': handle_payment_succeeded,
+    'payment_intent.payment_failed': handle_payment_failed
+}
+
+def handle_stripe_webhook():
+    if not Config.STRIPE_WEBHOOK_SECRET:
+        return jsonify({'error': 'Stripe webhooks are not configured'}), 503
+
+    try:
+        event = stripe.Webhook.construct_event(
+            request.get_data(),
+            request.headers.get('Stripe-Signature', ''),
+            Config.STRIPE_WEBHOOK_SECRET
+        )
+    except ValueError:
+        return jsonify({'error': 'Invalid payload'}), 400
+    except stripe.error.SignatureVerificationError:
+        return jsonify({'error': 'Invalid signature'}), 400
+
+    handler = EVENT_HANDLERS.get(event['type'])
+    if handler:
+        try:
+            handler(event['data']['object'].to_dict())
+        except Exception as e:
+            # A non-2xx response makes Stripe redeliver the event later.
+            current_app.logger.error(f"Error handling Stripe event {event['id']}: {e}")
+            return jsonify({'error': 'Failed to process event'}), 500
+
+    return jsonify({'received': True}), 200
@@ -0,0 +1,270 @@
+import logging
+import random
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+import requests
+from app.config import Config
+from app.email_utils import send_emails_via_resend, RESEND_BATCH_MAX
+
+logger = logging.getLogger(__name__)
+
+# Local SQLite stand-in for an outbox table: requests only insert here, and the sender
+# threads started by init_email_outbox() deliver the messages to Resend.
+SCHEMA = """
+create table if not exists email_outbox (
+    id integer primary key autoincrement,
+    to_email text not null,
+    subject text not null,
+    html text not null,
+    status text not null default 'pending',
+    attempts integer not null default 0,
+    created_at real not null,
+    next_attempt_at real not null,
+    claimed_at real,
+    last_error text
+);
+create index if not exists email_outbox_due_idx on email_outbox (status, next_attempt_at);
+"""
+
+# 429 and 5xx are worth retrying; any other 4xx will fail the same way every time.
+RETRYABLE_STATUS = {408, 429}
+# A bad or rotated RESEND_API_KEY fails every message alike, so sending pauses instead
+# of spending the messages' attempts.
+AUTH_STATUS = {401, 403}
+# Validation errors may come from one bad message, so the batch is resent one by one.
+VALIDATION_STATUS = {400, 422}
+
+connections = threading.local()
+wakeup = threading.Event()
+workers = []
+workers_lock = threading.Lock()
+
+metrics_lock = threading.Lock()
+metrics = {"sent": 0, "failed": 0, "retried": 0, "batches": 0}
+delivery_latencies = deque(maxlen=1000)
+send_latencies = deque(maxlen=1000)
+
+pause_lock = threading.Lock()
+pause = {"until": 0.0, "failures": 0}
+
+def get_connection():
+    connection = getattr(connections, 'connection', None)
+    if connection is None:
+        connection = sqlite3.connect(Config.EMAIL_OUTBOX_PATH, timeout=30, isolation_level=None, check_same_thread=False)
+        connection.execute('pragma journal_mode=wal')
+        connection.executescript(SCHEMA)
+        connections.connection = connection
+    return connection
+
+@contextmanager
+def write_transaction():
+    """Run the block in one transaction holding SQLite's write lock.
+
+    The connection is in autocommit mode (isolation_level=None), so without this every
+    statement would commit on its own.
+    """
+    connection = get_connection()
+    connection.execute('begin immediate')
+    try:
+        yield connection
+    except BaseException:
+        connection.execute('rollback')
+        raise
+    connection.execute('commit')
+
+def enqueue_emails(messages):
+    """Store (to_email, subject, html) messages for delivery and return their outbox ids."""
+    now = time.time()
+    ids = []
+    with write_transaction() as connection:
+        for to_email, subject, html in messages:
+            cursor = connection.execute(
+                'insert into email_outbox (to_email, subject, html, created_at, next_attempt_at) values (?, ?, ?, ?, ?)',
+                (to_email, subject, html, now, now)
+            )
+            ids.append(cursor.lastrowid)
+    wakeup.set()
+    return ids
+
+def enqueue_email(to_email, subject, html):
+    return enqueue_emails([(to_email, subject, html)])[0]
+
+def claim_batch(limit):
+    """Mark up to limit due messages as sending and return them.
+
+    The write lock is taken up front, so two workers (or two processes sharing the
+    file) never claim the same row.
+    """
+    now = time.time()
+    with write_transaction() as connection:
+        rows = connection.execute(
+            """select id, to_email, subject, html, attempts, created_at from email_outbox
+                where (status = 'pending' and next_attempt_at <= ?)
+                   or (status = 'sending' and claimed_at <= ?)
+                order by id limit ?""",
+            (now, now - Config.EMAIL_OUTBOX_CLAIM_TIMEOUT, limit)
+        ).fetchall()
+        connection.executemany(
+            "update email_outbox set status = 'sending', claimed_at = ? where id = ?",
+            [(now, row[0]) for row in rows]
+        )
+    return rows
+
+def backoff_seconds(attempts):
+    delay = min(Config.EMAIL_OUTBOX_BACKOFF * 2 ** (attempts - 1), Config.EMAIL_OUTBOX_BACKOFF_MAX)
+    return delay * random.uniform(0.5, 1.0)
+
+def pause_sending():
+    """Hold off every sender for a backoff that grows with each consecutive auth failure."""
+    with pause_lock:
+        pause["failures"] += 1
+        pause["until"] = time.time() + backoff_seconds(pause["failures"])
+        return pause["until"]
+
+def resume_sending():
+    with pause_lock:
+        pause["failures"] = 0
+        pause["until"] = 0.0
+
+def paused_seconds():
+    with pause_lock:
+        return max(pause["until"] - time.time(), 0.0)
+
+def release(rows, error, next_attempt_at):
+    """Put claimed rows back as pending without counting an attempt."""
+    with write_transaction() as connection:
+        connection.executemany(
+            "update email_outbox set status = 'pending', next_attempt_at = ?, last_error = ?, claimed_at = null where id = ?",
+            [(next_attempt_at, error, row[0]) for row in rows]
+        )
+
+def mark_sent(rows):
+    now = time.time()
+    with write_transaction() as connection:
+        connection.executemany('delete from email_outbox where id = ?', [(row[0],) for row in rows])
+    with metrics_lock:
+        metrics["sent"] += len(rows)
+        delivery_latencies.extend(now - row[5] for row in rows)
+
+def mark_failed(rows, error, retryable):
+    now = time.time()
+    retries = []
+    failures = []
+    for row in rows:
+        attempts = row[4] + 1
+        if retryable and attempts < Config.EMAIL_OUTBOX_MAX_ATTEMPTS:
+            retries.append((attempts, now + backoff_seconds(attempts), error, row[0]))
+        else:
+            failures.append((attempts, error, row[0]))
+            logger.error(f"Giving up on email {row[0]} to {row[1]} after {attempts} attempt(s): {error}")
+
+    with write_transaction() as connection:
+        connection.executemany(
+            "update email_outbox set status = 'pending', attempts = ?, next_attempt_at = ?, last_error = ?, claimed_at = null where id = ?",
+            retries
+        )
+        connection.executemany(
+            "update email_outbox set status = 'failed', attempts = ?, last_error = ?, claimed_at = null where id = ?",
+            failures
+        )
+    with metrics_lock:
+        metrics["retried"] += len(retries)
+        metrics["failed"] += len(failures)
+
+def deliver(rows):
+    started = time.monotonic()
+    try:
+        response = send_emails_via_resend([(row[1], row[2], row[3]) for row in rows])
+    except requests.RequestException as e:
+        mark_failed(rows, str(e), retryable=True)
+        return
+    finally:
+        with metrics_lock:
+            metrics["batches"] += 1
+            send_latencies.append(time.monotonic() - started)
+
+    error = f"{response.status_code}: {response.text}"
+    if response.status_code == 200:
+        resume_sending()
+        mark_sent(rows)
+    elif response.status_code in AUTH_STATUS:
+        resume_at = pause_sending()
+        logger.error(f"Resend rejected the API key; pausing email delivery for {resume_at - time.time():.0f}s: {error}")
+        release(rows, error, resume_at)
+    elif response.status_code in RETRYABLE_STATUS or response.status_code >= 500:
+        mark_failed(rows, error, retryable=True)
+    elif response.status_code in VALIDATION_STATUS and len(rows) > 1:
+        # One bad address rejects the whole batch; send one by one so only it fails.
+        for row in rows:
+            deliver([row])
+    else:
+        mark_failed(rows, error, retryable=False)
+
+def drain_once():
+    if paused_seconds():
+        return 0
+    rows = claim_batch(min(Config.EMAIL_OUTBOX_BATCH_SIZE, RESEND_BATCH_MAX))
+    if rows:
+        deliver(rows)
+    return len(rows)
+
+def run_worker():
+    while True:
+        wakeup.clear()
+        try:
+            if drain_once():
+                continue
+        except Exception as e:
+            logger.error(f"Email outbox worker error: {e}")
+        wakeup.wait(Config.EMAIL_OUTBOX_POLL_INTERVAL)
+
+def start_workers(count=None):
+    with workers_lock:
+        workers[:] = [worker for worker in workers if worker.is_alive()]
+        for index in range(len(workers), count or Config.EMAIL_OUTBOX_WORKERS):
+            worker = threading.Thread(target=run_worker, name=f'email-outbox-{index}', daemon=True)
+            worker.start()
+            workers.append(worker)
+
+def init_email_outbox(app):
+    get_connection()
+    if Config.EMAIL_OUTBOX_WORKERS <= 0:
+        return
+
+    # Senders start with the first request, so `flask` CLI commands never spawn them.
+    @app.before_request
+    def start_email_workers():
+        if len(workers) < Config.EMAIL_OUTBOX_WORKERS:
+            start_workers()
+
+def latency_summary(values):
+    if not values:
+        return {"p50_ms": None, "p95_ms": None, "max_ms": None}
+    ordered = sorted(values)
+    def at(fraction):
+        return round(ordered[min(int(fraction * len(ordered)), len(ordered) - 1)] * 1000, 1)
+    return {"p50_ms": at(0.5), "p95_ms": at(0.95), "max_ms": round(ordered[-1] * 1000, 1)}
+
+def outbox_stats():
+    connection = get_connection()
+    counts = dict(connection.execute('select status, count(*) from email_outbox group by status').fetchall())
+    oldest = connection.execute("select min(created_at) from email_outbox where status in ('pending', 'sending')").fetchone()[0]
+    with metrics_lock:
+        totals = dict(metrics)
+        delivery = latency_summary(list(delivery_latencies))
+        send = latency_summary(list(send_latencies))
+    return {
+        "depth": counts.get('pending', 0) + counts.get('sending', 0),
+        "pending": counts.get('pending', 0),
+        "sending": counts.get('sending', 0),
+        "dead": counts.get('failed', 0),
+        "oldest_pending_seconds": round(time.time() - oldest, 1) if oldest else None,
+        "workers": sum(worker.is_alive() for worker in workers),
+        "paused_seconds": round(paused_seconds(), 1),
+        **{f"{name}_total": value for name, value in totals.items()},
+        "delivery_latency": delivery,
+        "send_latency": send
+    }
@@ -0,0 +1,34 @@
+import os
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache, select_autoescape
+from app.config import Config
+
+TEMPLATE_FOLDER = os.path.join(os.path.dirname(__file__), 'templates')
+
+def create_email_environment():
+    """Jinja environment for email templates that works without a Flask app or request.
+
+    Compiled templates stay in the environment's in-process cache; with auto_reload off,
+    get_template() returns them without checking the files again. The bytecode cache
+    lets a fresh process skip compiling them at all.
+    """
+    bytecode_cache = None
+    if Config.EMAIL_TEMPLATE_CACHE_DIR:
+        os.makedirs(Config.EMAIL_TEMPLATE_CACHE_DIR, exist_ok=True)
+        bytecode_cache = FileSystemBytecodeCache(Config.EMAIL_TEMPLATE_CACHE_DIR)
+
+    environment = Environment(
+        loader=FileSystemLoader(TEMPLATE_FOLDER),
+        autoescape=select_autoescape(['html', 'xml']),
+        bytecode_cache=bytecode_cache,
+        auto_reload=Config.EMAIL_TEMPLATE_AUTO_RELOAD
+    )
+    environment.globals['logo_url'] = Config.LOGO_URL
+    return environment
+
+email_environment = create_email_environment()
+
+def get_email_template(name):
+    return email_environment.get_template(name)
+
+def render_email(name, **context):
+    return get_email_template(name).render(**context)
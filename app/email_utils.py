@@ -1,45 +1,67 @@
-from flask import render_template
-import requests
 from app.config import Config
+from app.http_client import http_session
+from app.email_templates import render_email, get_email_template
+
+def invoice_subject(label):
+    return f"Your {label} Invoice from Paw Portal"
 
 def generate_invoice_html(label, amount, confirmation_url):
-    return render_template(
+    return render_email(
         'emails/invoice_email.html', 
         label=label, 
         amount=amount, 
-        confirmation_url=confirmation_url,
-        logo_url=Config.LOGO_URL
+        confirmation_url=confirmation_url
     )
 
+def generate_invoice_emails(invoices):
+    """Build (to_email, subject, html) for (to_email, label, amount, confirmation_url) tuples.
+
+    The template is looked up once and rendered per recipient, so this also runs
+    outside a request.
+    """
+    template = get_email_template('emails/invoice_email.html')
+    return [
+        (to_email, invoice_subject(label), template.render(label=label, amount=amount, confirmation_url=confirmation_url))
+        for to_email, label, amount, confirmation_url in invoices
+    ]
+
 def generate_payment_confirmation_html(first_name, amount, title):
-    return render_template(
+    return render_email(
         'emails/payment_confirmation.html', 
         first_name=first_name, 
         amount=amount, 
-        title=title,
-        logo_url=Config.LOGO_URL
+        title=title
     )
 
-def send_invoice_email_via_resend(to_email, subject, html_content):
-    headers = {
+RESEND_EMAILS_URL = 'https://api.resend.com/emails'
+RESEND_BATCH_URL = 'https://api.resend.com/emails/batch'
+RESEND_BATCH_MAX = 100
+
+def resend_headers():
+    return {
         'Authorization': f'Bearer {Config.RESEND_API_KEY}',
         'Content-Type': 'application/json'
     }
-    payload = {
+
+def resend_payload(to_email, subject, html_content):
+    return {
         'from': 'invoice@pawportal.io',
         'to': [to_email],
         'subject': subject,
         'html': html_content
     }
-    response = requests.post('https://api.resend.com/emails', json=payload, headers=headers)
-    
-    if response.status_code != 200:
-        print(f'Failed to send email: {response.text}')
-    return response.status_code == 200
 
-def send_payment_confirmation_email(to_email, first_name, amount, title):
-    subject = f"Payment Confirmation for {title}"
-    
-    html_content = generate_payment_confirmation_html(first_name, amount, title)
+def send_emails_via_resend(messages):
+    """Send up to RESEND_BATCH_MAX (to_email, subject, html) messages in one request.
 
-    return send_invoice_email_via_resend(to_email, subject, html_content)
+    More than one message goes through the batch endpoint, which Resend accepts or
+    rejects as a whole. The response is returned as is.
+    """
+    if len(messages) == 1:
+        return http_session.post(RESEND_EMAILS_URL, json=resend_payload(*messages[0]), headers=resend_headers())
+    payload = [resend_payload(*message) for message in messages]
+    return http_session.post(RESEND_BATCH_URL, json=payload, headers=resend_headers())
+
+def payment_confirmation_email(first_name, amount, title):
+    subject = f"Payment Confirmation for {title}"
+    return subject, generate_payment_confirmation_html(first_name, amount, title)
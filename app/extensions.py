@@ -3,6 +3,7 @@ from flask_cors import CORS
 from supabase import create_client
 import stripe
 import openai
+from app.http_client import http_session
 import os
 
 def init_extensions(app):
@@ -20,6 +21,7 @@ def init_supabase(app):
 
 def init_stripe():
     stripe.api_key = os.getenv('STRIPE_SECRET_KEY')
+    stripe.default_http_client = stripe.RequestsClient(timeout=http_session.timeout, session=http_session)
 
 def init_openai():
     openai.api_key = os.getenv('OPENAI_API_KEY')
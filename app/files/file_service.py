@@ -3,6 +3,7 @@ import datetime
 from flask import session, jsonify
 from supabase import Client
 from storage3.utils import StorageException
+from app.uploads import spooled_upload
 
 class FileService:
     def __init__(self, supabase_client: Client, bucket_name: str):
@@ -39,9 +40,8 @@ class FileService:
             if not file or file.filename == '':
                 return {"error": "No file provided or selected"}, 400  # Error if no file or empty filename
 
-            # Construct the file path and read the file content
+            # Construct the file path; the content is spooled rather than read into memory
             file_path = self.construct_file_path(client_id, file.filename, folder_path)
-            file_content = file.read()
 
             # Determine the file content type
             file_extension = os.path.splitext(file.filename)[1].lower()
@@ -55,24 +55,25 @@ class FileService:
             elif file_extension == '.gif':
                 content_type = 'image/gif'
 
-            # Upload the file to Supabase storage
-            try:
-                file_options = {"contentType": content_type}
-                self.supabase.storage.from_(self.bucket_name).upload(file_path, file_content, file_options)
-
-                metadata = {
-                    "file_name": file.filename,
-                    "client_id": client_id,
-                    "folder_path": self.parse_folder_path(folder_path),
-                    "upload_time": datetime.datetime.now().isoformat(),
-                    "content_type": content_type
-                }
-                return {"message": "File uploaded successfully", "path": file_path, "metadata": metadata}, 200
-            except StorageException as e:
-                # Handle duplicate file errors and other issues
-                if isinstance(e.args[0], dict) and e.args[0].get('statusCode') == 400 and e.args[0].get('error') == 'Duplicate':
-                    return self.handle_duplicate_file(client_id, file, file_content, folder_path)
-                return {"error": f"Failed to upload file: {str(e)}"}, 500
+            with spooled_upload(file) as file_content:
+                # Upload the file to Supabase storage
+                try:
+                    file_options = {"contentType": content_type}
+                    self.supabase.storage.from_(self.bucket_name).upload(file_path, file_content, file_options)
+
+                    metadata = {
+                        "file_name": file.filename,
+                        "client_id": client_id,
+                        "folder_path": self.parse_folder_path(folder_path),
+                        "upload_time": datetime.datetime.now().isoformat(),
+                        "content_type": content_type
+                    }
+                    return {"message": "File uploaded successfully", "path": file_path, "metadata": metadata}, 200
+                except StorageException as e:
+                    # Handle duplicate file errors and other issues
+                    if isinstance(e.args[0], dict) and e.args[0].get('statusCode') == 400 and e.args[0].get('error') == 'Duplicate':
+                        return self.handle_duplicate_file(client_id, file, file_content, folder_path)
+                    return {"error": f"Failed to upload file: {str(e)}"}, 500
 
         except Exception as e:
             return {"error": f"Internal server error: {str(e)}"}, 500
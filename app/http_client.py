@@ -0,0 +1,187 @@
+import random
+import threading
+import time
+from collections import deque
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+from app.config import Config
+
+# Only methods that are safe to repeat are retried here; POSTs are retried by their
+# callers (the email outbox, Stripe's own idempotent retries) where that is safe.
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+RETRY_STATUS = {502, 503, 504}
+
+class CircuitOpenError(requests.ConnectionError):
+    """Raised instead of calling a host whose circuit breaker is open."""
+
+class CircuitBreaker:
+    """Stop calling a host after `threshold` consecutive failures.
+
+    After `reset_timeout` seconds one trial request is let through (half-open); its
+    outcome closes the circuit again or keeps it open for another `reset_timeout`.
+    """
+
+    def __init__(self, host, threshold, reset_timeout):
+        self.host = host
+        self.threshold = threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at = None
+        self.probing = False
+        self.rejected = 0
+        self.lock = threading.Lock()
+
+    def state(self):
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_timeout:
+            return 'half-open'
+        return 'open'
+
+    def before_request(self):
+        with self.lock:
+            state = self.state()
+            if state == 'closed':
+                return
+            if state == 'half-open' and not self.probing:
+                self.probing = True
+                return
+            self.rejected += 1
+        raise CircuitOpenError(f'Circuit open for {self.host}')
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.probing = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.probing or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+            self.probing = False
+
+    def stats(self):
+        with self.lock:
+            return {"state": self.state(), "consecutive_failures": self.failures, "rejected": self.rejected}
+
+class RetryBudget:
+    """Allow retries up to `ratio` of the requests made in the last `window` seconds.
+
+    `minimum` retries are always allowed so a quiet client can still retry; the ratio
+    keeps a degraded vendor from receiving a multiple of the normal traffic.
+    """
+
+    def __init__(self, ratio, minimum, window=10.0):
+        self.ratio = ratio
+        self.minimum = minimum
+        self.window = window
+        self.requests = deque()
+        self.retries = deque()
+        self.exhausted = 0
+        self.lock = threading.Lock()
+
+    def trim(self, now):
+        for events in (self.requests, self.retries):
+            while events and now - events[0] > self.window:
+                events.popleft()
+
+    def record_request(self):
+        with self.lock:
+            now = time.monotonic()
+            self.trim(now)
+            self.requests.append(now)
+
+    def try_spend(self):
+        with self.lock:
+            now = time.monotonic()
+            self.trim(now)
+            if len(self.retries) >= self.minimum + self.ratio * len(self.requests):
+                self.exhausted += 1
+                return False
+            self.retries.append(now)
+            return True
+
+    def stats(self):
+        with self.lock:
+            self.trim(time.monotonic())
+            return {"requests": len(self.requests), "retries": len(self.retries), "exhausted": self.exhausted}
+
+class OutboundSession(requests.Session):
+    """requests.Session with pooled keep-alive connections, default timeouts, budgeted
+    retries of idempotent requests and a circuit breaker per host.
+
+    One instance (http_session) is shared by every outbound integration.
+    """
+
+    def __init__(self):
+        super().__init__()
+        adapter = HTTPAdapter(pool_connections=Config.HTTP_POOL_HOSTS, pool_maxsize=Config.HTTP_POOL_SIZE)
+        self.mount('https://', adapter)
+        self.mount('http://', adapter)
+        self.timeout = (Config.HTTP_CONNECT_TIMEOUT, Config.HTTP_READ_TIMEOUT)
+        self.retry_budget = RetryBudget(Config.HTTP_RETRY_BUDGET_RATIO, Config.HTTP_RETRY_BUDGET_MIN)
+        self.breakers = {}
+        self.breakers_lock = threading.Lock()
+
+    def breaker(self, host):
+        with self.breakers_lock:
+            if host not in self.breakers:
+                self.breakers[host] = CircuitBreaker(host, Config.HTTP_BREAKER_FAILURES, Config.HTTP_BREAKER_RESET)
+            return self.breakers[host]
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        breaker = self.breaker(urlsplit(url).netloc)
+        retryable = method.upper() in IDEMPOTENT_METHODS
+        self.retry_budget.record_request()
+
+        attempt = 0
+        while True:
+            breaker.before_request()
+            try:
+                response = super().request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout):
+                breaker.record_failure()
+                if not self.retry(retryable, attempt, breaker):
+                    raise
+                attempt += 1
+                continue
+            except BaseException:
+                # Any other error still ends a half-open probe; otherwise the breaker
+                # would wait for its outcome forever and reject every later call.
+                breaker.record_failure()
+                raise
+
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if response.status_code in RETRY_STATUS and self.retry(retryable, attempt, breaker):
+                response.close()
+                attempt += 1
+                continue
+            return response
+
+    def retry(self, retryable, attempt, breaker):
+        # A retry that would be rejected by the breaker is pointless; surface the real failure.
+        if not retryable or attempt >= Config.HTTP_MAX_RETRIES or breaker.state() != 'closed':
+            return False
+        if not self.retry_budget.try_spend():
+            return False
+        time.sleep(Config.HTTP_RETRY_BACKOFF * 2 ** attempt * random.uniform(0.5, 1.0))
+        return True
+
+    def stats(self):
+        with self.breakers_lock:
+            breakers = dict(self.breakers)
+        return {
+            "timeout_seconds": {"connect": self.timeout[0], "read": self.timeout[1]},
+            "retry_budget": self.retry_budget.stats(),
+            "breakers": {host: breaker.stats() for host, breaker in breakers.items()}
+        }
+
+http_session = OutboundSession()
@@ -1,8 +1,207 @@
 import csv
 import io
-from flask import session, jsonify, make_response
-from app.models.people_model import PeopleModel
-from app.models.pet_model import PetModel
+import json
+import zlib
+from datetime import datetime, timezone
+from flask import session, jsonify, Response, current_app, request
+from app.config import Config
+from app.models.people_model import PeopleModel, PEOPLE_COLUMNS
+from app.models.pet_model import PetModel, PET_COLUMNS
+from app.models.pet_query import parse_pet_query
+
+try:
+    import pyarrow
+    import pyarrow.parquet
+except ImportError:
+    pyarrow = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+def iter_pages(fetch_page, first_page):
+    yield first_page['data']
+    cursor = first_page['next_cursor']
+    while cursor:
+        page = fetch_page(cursor)
+        if not page['success']:
+            raise RuntimeError(page['message'])
+        yield page['data']
+        cursor = page['next_cursor']
+
+def csv_chunks(pages, fieldnames):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fieldnames)
+    writer.writeheader()
+    for rows in pages:
+        writer.writerows(rows)
+        yield buffer.getvalue().encode('utf-8')
+        buffer.seek(0)
+        buffer.truncate(0)
+
+def ndjson_chunks(pages, fieldnames):
+    for rows in pages:
+        lines = [json.dumps({field: row.get(field) for field in fieldnames}, default=str) for row in rows]
+        if lines:
+            yield ('\n'.join(lines) + '\n').encode('utf-8')
+
+class ChunkSink:
+    """Write-only file object that hands back whatever pyarrow wrote since the last drain."""
+
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+        self.closed = False
+
+    def write(self, data):
+        data = bytes(data)
+        self.chunks.append(data)
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.closed = True
+
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def parse_timestamp(value):
+    moment = value if isinstance(value, datetime) else datetime.fromisoformat(value)
+    # The app stores and compares naive timestamps as UTC.
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment
+
+def parse_int(value):
+    # person_age is free-form input; a value that is not a whole number exports as null.
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return None
+
+# Arrow/Parquet type and converter for columns that are not plain strings, so readers of
+# the typed formats get real timestamps and numbers instead of re-parsing text.
+ARROW_COLUMN_TYPES = {
+    'created_at': (lambda: pyarrow.timestamp('us', tz='UTC'), parse_timestamp),
+    'person_age': (lambda: pyarrow.int64(), parse_int),
+}
+ARROW_STRING_COLUMN = (lambda: pyarrow.string(), str)
+
+def arrow_schema(fieldnames):
+    return pyarrow.schema([(field, ARROW_COLUMN_TYPES.get(field, ARROW_STRING_COLUMN)[0]()) for field in fieldnames])
+
+def to_record_batch(rows, fieldnames, schema):
+    columns = []
+    for field in fieldnames:
+        convert = ARROW_COLUMN_TYPES.get(field, ARROW_STRING_COLUMN)[1]
+        values = [None if row.get(field) is None else convert(row.get(field)) for row in rows]
+        columns.append(pyarrow.array(values, schema.field(field).type))
+    return pyarrow.record_batch(columns, schema=schema)
+
+def arrow_chunks(pages, fieldnames):
+    schema = arrow_schema(fieldnames)
+    sink = ChunkSink()
+    writer = pyarrow.ipc.new_stream(sink, schema)
+    for rows in pages:
+        writer.write_batch(to_record_batch(rows, fieldnames, schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def parquet_chunks(pages, fieldnames):
+    schema = arrow_schema(fieldnames)
+    sink = ChunkSink()
+    writer = pyarrow.parquet.ParquetWriter(sink, schema, compression='zstd')
+    for rows in pages:
+        writer.write_batch(to_record_batch(rows, fieldnames, schema))
+        yield sink.drain()
+    writer.close()
+    yield sink.drain()
+
+def gzip_chunks(chunks):
+    compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+def zstd_chunks(chunks):
+    compressor = zstandard.ZstdCompressor().compressobj()
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if data:
+            yield data
+    yield compressor.flush()
+
+EXPORT_FORMATS = {
+    'csv': (csv_chunks, 'text/csv', 'csv'),
+    'ndjson': (ndjson_chunks, 'application/x-ndjson', 'ndjson'),
+    'arrow': (arrow_chunks, 'application/vnd.apache.arrow.stream', 'arrows'),
+    'parquet': (parquet_chunks, 'application/vnd.apache.parquet', 'parquet'),
+}
+
+PYARROW_FORMATS = ('arrow', 'parquet')
+
+EXPORT_COMPRESSIONS = {
+    'gzip': gzip_chunks,
+    'zstd': zstd_chunks,
+}
+
+def get_export_options():
+    export_format = request.args.get('format', 'csv').lower()
+    compression = request.args.get('compression', '').lower() or None
+
+    if export_format not in EXPORT_FORMATS:
+        return None, None, (jsonify({"success": False, "error": f"Unsupported export format. Use one of: {', '.join(EXPORT_FORMATS)}"}), 400)
+    if compression and compression not in EXPORT_COMPRESSIONS:
+        return None, None, (jsonify({"success": False, "error": f"Unsupported compression. Use one of: {', '.join(EXPORT_COMPRESSIONS)}"}), 400)
+    if export_format in PYARROW_FORMATS and pyarrow is None:
+        return None, None, (jsonify({"success": False, "error": f"The {export_format} format requires pyarrow to be installed"}), 501)
+    if compression == 'zstd' and zstandard is None:
+        return None, None, (jsonify({"success": False, "error": "zstd compression requires zstandard to be installed"}), 501)
+    return export_format, compression, None
+
+def stream_export(fetch_page, fieldnames, basename, label):
+    export_format, compression, error = get_export_options()
+    if error:
+        return error
+
+    first_page = fetch_page(None)
+    if not first_page['success']:
+        return jsonify({"success": False, "error": first_page['message']}), 404
+    if not first_page['data']:
+        return jsonify({"success": False, "error": f"No {label} found for this client."}), 404
+
+    make_chunks, content_type, extension = EXPORT_FORMATS[export_format]
+    logger = current_app.logger
+
+    def generate():
+        try:
+            chunks = make_chunks(iter_pages(fetch_page, first_page), fieldnames)
+            if compression:
+                chunks = EXPORT_COMPRESSIONS[compression](chunks)
+            yield from chunks
+        except Exception as e:
+            logger.error(f"Export of {label} aborted mid-stream: {str(e)}")
+            raise
+
+    response = Response(generate())
+    response.headers["Content-Disposition"] = f"attachment; filename={basename}.{extension}"
+    response.headers["Content-type"] = content_type
+    if compression:
+        response.headers["Content-Encoding"] = compression
+        response.headers["Vary"] = "Accept-Encoding"
+    return response
 
 def export_people(supabase_client):
     try:
@@ -11,23 +210,12 @@ def export_people(supabase_client):
             return jsonify({"success": False, "error": "Client not logged in"}), 401
 
         people_model = PeopleModel(supabase_client)
-        result = people_model.get_all_people(client_id)
+        fields = ','.join(PEOPLE_COLUMNS)
 
-        if not result['success']:
-            return jsonify({"success": False, "error": result['message']}), 404
+        def fetch_page(cursor):
+            return people_model.get_all_people(client_id, limit=Config.EXPORT_PAGE_SIZE, cursor=cursor, fields=fields)
 
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
-            "person_id", "client_id", "person_first_name", "person_last_name", "person_email",
-            "person_phone", "person_address", "person_zipcode", "person_state", "person_city", "person_age", "person_gender", "created_at"
-        ])
-        writer.writeheader()
-        writer.writerows(result['data'])
-
-        response = make_response(output.getvalue())
-        response.headers["Content-Disposition"] = "attachment; filename=people.csv"
-        response.headers["Content-type"] = "text/csv"
-        return response
+        return stream_export(fetch_page, PEOPLE_COLUMNS, "people", "people")
 
     except Exception as e:
         return jsonify({"success": False, "error": f"An error occurred while exporting people data: {str(e)}"}), 500
@@ -39,24 +227,20 @@ def export_pets(supabase_client):
         if not client_id:
             return jsonify({"success": False, "error": "Client not logged in"}), 401
 
+        try:
+            pet_query = parse_pet_query(request.args)
+        except ValueError as e:
+            return jsonify({"success": False, "error": str(e)}), 400
+        # Exports read every page, so a total count would only add work to each request.
+        pet_query['count'] = None
+
         pet_model = PetModel(supabase_client)
-        result = pet_model.get_all_pets(client_id)
-
-        if not result['success']:
-            return jsonify({"success": False, "error": result['message']}), 404
-
-        output = io.StringIO()
-        writer = csv.DictWriter(output, fieldnames=[
-            "pet_id", "pet_name", "pet_owner_id", "pet_breed", "pet_type", "pet_sex", "pet_photo",
-            "pet_color", "pet_background", "pet_status", "client_id", "created_at"
-        ])
-        writer.writeheader()
-        writer.writerows(result['data'])
-
-        response = make_response(output.getvalue())
-        response.headers["Content-Disposition"] = "attachment; filename=pets.csv"
-        response.headers["Content-type"] = "text/csv"
-        return response
+        fields = ','.join(PET_COLUMNS)
+
+        def fetch_page(cursor):
+            return pet_model.get_all_pets(client_id, limit=Config.EXPORT_PAGE_SIZE, cursor=cursor, fields=fields, pet_query=pet_query)
+
+        return stream_export(fetch_page, PET_COLUMNS, "pets", "matching pets")
 
     except Exception as e:
         return jsonify({"success": False, "error": f"An error occurred while exporting pets data: {str(e)}"}), 500
@@ -1,7 +1,16 @@
 from flask import Blueprint, jsonify, request, current_app, session
-from app.models.people_model import PeopleModel
-from app.models.pet_model import PetModel
+from app.config import Config
+from app.models.people_model import PeopleModel, PEOPLE_COLUMNS
+from app.models.pet_model import PetModel, PET_COLUMNS
+from app.models.pagination import decode_cursor, decode_offset_cursor, parse_limit, parse_fields
+from app.models.pet_query import parse_pet_query
+from app.models.bulk import canonical_uuid
 from app.main.exporting import export_people, export_pets
+from app.cache import record_cache
+from app.analytics.result_cache import analytics_cache
+from app.email_outbox import outbox_stats
+from app.http_client import http_session
+from app.conditional import conditional_get
 from flask_cors import CORS
 
 main_bp = Blueprint('main_bp', __name__)
@@ -13,22 +22,41 @@ def get_client_id():
         return None, jsonify({"success": False, "error": "Client not logged in"}), 401
     return client_id, None, None
 
+def get_page_args(allowed_columns, id_column, sorted_page=False):
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        cursor = request.args.get('cursor') or None
+        if cursor:
+            (decode_offset_cursor if sorted_page else decode_cursor)(cursor)
+        fields = parse_fields(request.args.get('fields'), allowed_columns, id_column)
+    except ValueError as e:
+        return None, jsonify({"success": False, "error": str(e)}), 400
+    return {"limit": limit, "cursor": cursor, "fields": fields}, None, None
+
 @main_bp.route('/people', methods=['GET', 'OPTIONS'])
+@conditional_get
 def get_people_for_client():
     client_id, error_response, status_code = get_client_id()
     if error_response:
         return error_response, status_code
 
+    page_args, error_response, status_code = get_page_args(PEOPLE_COLUMNS, 'person_id')
+    if error_response:
+        return error_response, status_code
+
     people_model = PeopleModel(current_app.supabase)
-    result = people_model.get_all_people(client_id)
+    result = people_model.get_all_people(client_id, **page_args)
 
     if result['success']:
+        if 'next_cursor' in result:
+            return jsonify(result), 200
         return jsonify(result['data']), 200
     else:
         return jsonify({"success": False, "error": result['message']}), 404
 
 
 @main_bp.route('/person/<uuid:person_id>/pets', methods=['GET'])
+@conditional_get
 def get_pets_from_person(person_id):
     client_id, error_response, status_code = get_client_id()
     if error_response:
@@ -44,22 +72,33 @@ def get_pets_from_person(person_id):
  
     
 @main_bp.route('/pets', methods=['GET'])
+@conditional_get
 def get_pets_for_client():
     client_id, error_response, status_code = get_client_id()
     if error_response:
         return error_response, status_code
 
+    try:
+        pet_query = parse_pet_query(request.args)
+    except ValueError as e:
+        return jsonify({"success": False, "error": str(e)}), 400
+
+    page_args, error_response, status_code = get_page_args(PET_COLUMNS, 'pet_id', sorted_page=bool(pet_query['sort']))
+    if error_response:
+        return error_response, status_code
+
     pet_model = PetModel(current_app.supabase)
-    result = pet_model.get_all_pets(client_id)
+    result = pet_model.get_all_pets(client_id, pet_query=pet_query, **page_args)
     if result['success']:
         return jsonify(result), 200
     else:
         return jsonify({"success": False, "error": result['message']}), 404
 
 @main_bp.route('/person/<uuid:person_id>', methods=['GET'])
+@conditional_get
 def get_person(person_id):
     people_model = PeopleModel(current_app.supabase)
-    result = people_model.get_person_by_id(person_id)
+    result = people_model.get_person_by_id(person_id, session.get('user_id'))
 
     if result['success']:
         return jsonify(result['data']), 200
@@ -67,15 +106,124 @@ def get_person(person_id):
         return jsonify({"success": False, "error": result['message']}), 404
 
 @main_bp.route('/pet/<uuid:pet_id>', methods=['GET'])
+@conditional_get
 def get_pet(pet_id):
     pet_model = PetModel(current_app.supabase)
-    result = pet_model.get_pet_by_id(pet_id)
+    result = pet_model.get_pet_by_id(pet_id, session.get('user_id'))
 
     if result['success']:
         return jsonify(result['data']), 200
     else:
         return jsonify({"success": False, "error": result['message']}), 404
 
+def get_batch_ids():
+    if not request.is_json:
+        return None, jsonify({"success": False, "error": "Invalid content type. Expected 'application/json'."}), 415
+
+    ids = (request.get_json() or {}).get('ids')
+    if not isinstance(ids, list) or not ids:
+        return None, jsonify({"success": False, "error": "'ids' must be a non-empty list"}), 400
+    if len(ids) > Config.BATCH_LOOKUP_MAX:
+        return None, jsonify({"success": False, "error": f"At most {Config.BATCH_LOOKUP_MAX} ids can be requested at once"}), 400
+
+    invalid_ids = [record_id for record_id in ids if not canonical_uuid(record_id)]
+    if invalid_ids:
+        return None, jsonify({"success": False, "error": f"Invalid ids: {', '.join(map(str, invalid_ids))}"}), 400
+    return [canonical_uuid(record_id) for record_id in ids], None, None
+
+@main_bp.route('/pets/batch', methods=['POST'])
+def get_pets_batch():
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    pet_ids, error_response, status_code = get_batch_ids()
+    if error_response:
+        return error_response, status_code
+
+    pet_model = PetModel(current_app.supabase)
+    result = pet_model.get_pets_by_ids(pet_ids, client_id)
+
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify({"success": False, "error": result['message']}), 500
+
+@main_bp.route('/people/batch', methods=['POST'])
+def get_people_batch():
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    person_ids, error_response, status_code = get_batch_ids()
+    if error_response:
+        return error_response, status_code
+
+    people_model = PeopleModel(current_app.supabase)
+    result = people_model.get_people_by_ids(person_ids, client_id)
+
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify({"success": False, "error": result['message']}), 500
+
+def get_bulk_items(key):
+    if not request.is_json:
+        return None, jsonify({"success": False, "error": "Invalid content type. Expected 'application/json'."}), 415
+
+    items = (request.get_json() or {}).get(key)
+    if not isinstance(items, list) or not items:
+        return None, jsonify({"success": False, "error": f"'{key}' must be a non-empty list"}), 400
+    if len(items) > Config.BULK_MAX_ITEMS:
+        return None, jsonify({"success": False, "error": f"At most {Config.BULK_MAX_ITEMS} items can be sent at once"}), 400
+    return items, None, None
+
+@main_bp.route('/pets/bulk', methods=['POST', 'PUT', 'DELETE'])
+def bulk_pets():
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    items, error_response, status_code = get_bulk_items('ids' if request.method == 'DELETE' else 'pets')
+    if error_response:
+        return error_response, status_code
+
+    pet_model = PetModel(current_app.supabase)
+    if request.method == 'POST':
+        result = pet_model.bulk_add_pets(items, client_id)
+    elif request.method == 'PUT':
+        result = pet_model.bulk_upsert_pets(items, client_id)
+    else:
+        result = pet_model.bulk_delete_pets(items, client_id)
+
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify({"success": False, "error": result['message']}), 500
+
+@main_bp.route('/people/bulk', methods=['POST', 'PUT', 'DELETE'])
+def bulk_people():
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    items, error_response, status_code = get_bulk_items('ids' if request.method == 'DELETE' else 'people')
+    if error_response:
+        return error_response, status_code
+
+    people_model = PeopleModel(current_app.supabase)
+    if request.method == 'POST':
+        result = people_model.bulk_create_people(items, client_id)
+    elif request.method == 'PUT':
+        result = people_model.bulk_upsert_people(items, client_id)
+    else:
+        result = people_model.bulk_delete_people(items, client_id)
+
+    if result['success']:
+        return jsonify(result), 200
+    else:
+        return jsonify({"success": False, "error": result['message']}), 500
+
 @main_bp.route('/add_person', methods=['POST'])
 def add_person():
     if not request.is_json:
@@ -216,6 +364,30 @@ def update_person(person_id):
     except Exception as e:
         return jsonify({'success': False, 'error': f"An error occurred while updating the person: {str(e)}"}), 500
 
+@main_bp.route('/cache/stats', methods=['GET'])
+def get_cache_stats():
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    return jsonify({"success": True, "record_cache": record_cache.stats(), "analytics_cache": analytics_cache.stats()}), 200
+
+@main_bp.route('/email/outbox/stats', methods=['GET'])
+def get_email_outbox_stats():
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    return jsonify({"success": True, "email_outbox": outbox_stats()}), 200
+
+@main_bp.route('/http/stats', methods=['GET'])
+def get_http_stats():
+    client_id, error_response, status_code = get_client_id()
+    if error_response:
+        return error_response, status_code
+
+    return jsonify({"success": True, "http_client": http_session.stats()}), 200
+
 @main_bp.route('/export/people', methods=['GET'])
 def export_people_route():
     return export_people(current_app.supabase)
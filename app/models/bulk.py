@@ -0,0 +1,95 @@
+import uuid
+
+def chunked(items, size):
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def is_uuid(value):
+    try:
+        uuid.UUID(str(value))
+        return True
+    except ValueError:
+        return False
+
+def canonical_uuid(value):
+    """Return value as the lower-case, hyphenated form Postgres stores, or None if it is not a uuid."""
+    try:
+        return str(uuid.UUID(str(value)))
+    except ValueError:
+        return None
+
+def item_result(index, record_id, error=None):
+    if error:
+        return {"index": index, "id": record_id, "success": False, "error": error}
+    return {"index": index, "id": record_id, "success": True}
+
+def write_in_chunks(write_chunk, entries, id_column, chunk_size):
+    """Write (index, row) entries a chunk per call, retrying row by row when a chunk fails.
+
+    Rows inside one call must share the same columns, so each chunk is further split by
+    column set before it is sent.
+    """
+    results = []
+    for chunk in chunked(entries, chunk_size):
+        groups = {}
+        for index, row in chunk:
+            groups.setdefault(tuple(sorted(row)), []).append((index, row))
+
+        for group in groups.values():
+            try:
+                write_chunk([row for _, row in group])
+                results.extend(item_result(index, row[id_column]) for index, row in group)
+            except Exception as chunk_error:
+                if len(group) == 1:
+                    index, row = group[0]
+                    results.append(item_result(index, row[id_column], str(chunk_error)))
+                    continue
+                for index, row in group:
+                    try:
+                        write_chunk([row])
+                        results.append(item_result(index, row[id_column]))
+                    except Exception as row_error:
+                        results.append(item_result(index, row[id_column], str(row_error)))
+    return results
+
+def delete_in_chunks(delete_chunk, entries, chunk_size, not_found):
+    """Delete (index, id) entries a chunk per call, retrying row by row when a chunk fails.
+
+    delete_chunk(ids) returns the ids it actually deleted; ids it did not are reported
+    with the not_found message.
+    """
+    results = []
+
+    def delete(group):
+        deleted_ids = delete_chunk([record_id for _, record_id in group])
+        results.extend(item_result(index, record_id, None if record_id in deleted_ids else not_found) for index, record_id in group)
+
+    for chunk in chunked(entries, chunk_size):
+        try:
+            delete(chunk)
+        except Exception as chunk_error:
+            if len(chunk) == 1:
+                index, record_id = chunk[0]
+                results.append(item_result(index, record_id, str(chunk_error)))
+                continue
+            for index, record_id in chunk:
+                try:
+                    delete([(index, record_id)])
+                except Exception as row_error:
+                    results.append(item_result(index, record_id, str(row_error)))
+    return results
+
+def find_existing_ids(supabase_client, table, id_column, record_ids, client_id, chunk_size):
+    """Split the ids that already exist into (owned by client_id, owned by another client)."""
+    owned_ids = set()
+    foreign_ids = set()
+    for chunk in chunked(record_ids, chunk_size):
+        response = supabase_client.table(table).select(f'{id_column},client_id').in_(id_column, chunk).execute()
+        for row in response.data or []:
+            (owned_ids if row['client_id'] == client_id else foreign_ids).add(row[id_column])
+    return owned_ids, foreign_ids
+
+def summarize(results):
+    results = sorted(results, key=lambda result: result['index'])
+    succeeded = sum(1 for result in results if result['success'])
+    return {"success": True, "succeeded": succeeded, "failed": len(results) - succeeded, "results": results}
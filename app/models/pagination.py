@@ -0,0 +1,97 @@
+import base64
+import json
+import uuid
+from datetime import datetime
+from app.config import Config
+
+def encode_cursor(row, id_column):
+    payload = json.dumps([row.get('created_at'), row.get(id_column)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        created_at, record_id = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(created_at, str) or not isinstance(record_id, str):
+        raise ValueError("Invalid cursor")
+    # Both values are interpolated into a PostgREST or_() filter, so only a real timestamp
+    # and id may get through; anything else could add filter terms of its own.
+    try:
+        datetime.fromisoformat(created_at)
+        record_id = str(uuid.UUID(record_id))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    return created_at, record_id
+
+def parse_limit(value):
+    if value is None or value == '':
+        return None
+    try:
+        limit = int(value)
+    except (TypeError, ValueError):
+        raise ValueError("limit must be an integer")
+    if limit < 1:
+        raise ValueError("limit must be a positive integer")
+    return min(limit, Config.PAGE_SIZE_MAX)
+
+def parse_fields(fields, allowed_columns, id_column):
+    if not fields:
+        return '*'
+    requested = [field.strip() for field in fields.split(',') if field.strip()]
+    unknown = [field for field in requested if field not in allowed_columns]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    # The cursor is built from these two columns, so they are always selected.
+    for column in (id_column, 'created_at'):
+        if column not in requested:
+            requested.append(column)
+    return ','.join(requested)
+
+def encode_offset_cursor(offset):
+    payload = json.dumps([offset], separators=(',', ':'))
+    return base64.urlsafe_b64encode(payload.encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_offset_cursor(cursor):
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        offset, = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError, UnicodeError):
+        raise ValueError("Invalid cursor")
+    if not isinstance(offset, int) or isinstance(offset, bool) or offset < 0:
+        raise ValueError("Invalid cursor")
+    return offset
+
+def select_page(query, id_column, limit, cursor=None):
+    rows, next_cursor, _ = select_sorted_page(query, id_column, limit, cursor)
+    return rows, next_cursor
+
+def select_sorted_page(query, id_column, limit, cursor=None, sort=None):
+    """Fetch one page and return (rows, next_cursor, count).
+
+    Without a sort the page is keyset-paginated on (created_at, id). A custom sort of
+    [(column, descending), ...] pages by offset instead, with the id as a tie-breaker so the
+    order is stable. count is the response count, which is only set when the query was
+    built with select(..., count=...).
+    """
+    if sort:
+        offset = decode_offset_cursor(cursor) if cursor else 0
+        for column, descending in sort:
+            query = query.order(column, desc=descending, nullsfirst=False)
+        response = query.order(id_column).range(offset, offset + limit).execute()
+    else:
+        if cursor:
+            created_at, record_id = decode_cursor(cursor)
+            query = query.or_(
+                f'created_at.gt."{created_at}",'
+                f'and(created_at.eq."{created_at}",{id_column}.gt."{record_id}")'
+            )
+        response = query.order('created_at').order(id_column).limit(limit + 1).execute()
+
+    rows = response.data or []
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_offset_cursor(offset + limit) if sort else encode_cursor(rows[-1], id_column)
+    return rows, next_cursor, response.count
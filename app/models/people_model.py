@@ -1,19 +1,70 @@
 import uuid
+from app.cache import record_cache, invalidate_record
+from app.config import Config
+from app.models.pagination import select_page
+from app.signals import rows_created, rows_updated, rows_deleted
+from app.models.bulk import is_uuid, canonical_uuid, item_result, write_in_chunks, find_existing_ids, delete_in_chunks, summarize
+
+PEOPLE_COLUMNS = [
+    "person_id", "client_id", "person_first_name", "person_last_name", "person_email",
+    "person_phone", "person_address", "person_zipcode", "person_state", "person_city", "person_age", "person_gender", "created_at"
+]
+
+PERSON_FIELD_COLUMNS = {
+    'first_name': 'person_first_name',
+    'last_name': 'person_last_name',
+    'email': 'person_email',
+    'phone': 'person_phone',
+    'address': 'person_address',
+    'zipcode': 'person_zipcode',
+    'state': 'person_state',
+    'city': 'person_city',
+    'age': 'person_age',
+    'gender': 'person_gender'
+}
 
 class PeopleModel:
     def __init__(self, supabase_client):
         self.supabase = supabase_client
 
-    def get_person_by_id(self, person_id):
+    def get_person_by_id(self, person_id, client_id=None):
+        person_id = canonical_uuid(person_id) or str(person_id)
+        cache_key = ('people', person_id)
+        cached = record_cache.get(cache_key)
+        if cached is not None and cached.get('client_id') == client_id:
+            return {"success": True, "data": dict(cached)}
+
         try:
             response = self.supabase.table('people').select('*').eq('person_id', person_id).single().execute()
             if hasattr(response, 'data') and response.data:
+                record_cache.set(cache_key, dict(response.data))
                 return {"success": True, "data": response.data}
             else:
                 return {"success": False, "message": "Person not found."}
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
 
+    def get_people_by_ids(self, person_ids, client_id):
+        try:
+            person_ids = list(dict.fromkeys(canonical_uuid(person_id) or str(person_id) for person_id in person_ids))
+            found = {}
+            for person_id in person_ids:
+                cached = record_cache.get(('people', person_id))
+                if cached is not None and cached.get('client_id') == client_id:
+                    found[person_id] = dict(cached)
+
+            uncached = [person_id for person_id in person_ids if person_id not in found]
+            if uncached:
+                response = self.supabase.table('people').select('*').eq('client_id', client_id).in_('person_id', uncached).execute()
+                for row in response.data or []:
+                    record_cache.set(('people', row['person_id']), dict(row))
+                    found[row['person_id']] = row
+
+            missing = [person_id for person_id in person_ids if person_id not in found]
+            return {"success": True, "data": found, "missing": missing}
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+
     def create_person(self, first_name, last_name, email, phone, address, zipcode, state, city, age, gender, client_id):
         try:
             person_id = str(uuid.uuid4())
@@ -31,6 +82,7 @@ class PeopleModel:
                 'person_age': age,
                 'person_gender': gender
             }).execute()
+            rows_created.send('people', rows=response.data)
 
             if response.data:
                 return {"success": True, "data": response.data}
@@ -42,6 +94,8 @@ class PeopleModel:
     def delete_person(self, person_id):
         try:
             response = self.supabase.table('people').delete().eq('person_id', str(person_id)).execute()
+            invalidate_record('people', person_id)
+            rows_deleted.send('people', rows=response.data)
             if hasattr(response, 'data') and response.data:
                 return {"success": True}
             else:
@@ -49,9 +103,15 @@ class PeopleModel:
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
 
-    def get_all_people(self, client_id):
+    def get_all_people(self, client_id, limit=None, cursor=None, fields='*'):
         try:
-            response = self.supabase.table('people').select('*').eq('client_id', client_id).execute()
+            query = self.supabase.table('people').select(fields).eq('client_id', client_id)
+
+            if limit is not None or cursor:
+                rows, next_cursor = select_page(query, 'person_id', limit or Config.PAGE_SIZE_DEFAULT, cursor)
+                return {"success": True, "data": rows, "next_cursor": next_cursor}
+
+            response = query.execute()
             if hasattr(response, 'data') and response.data:
                 return {"success": True, "data": response.data}
             else:
@@ -62,10 +122,87 @@ class PeopleModel:
     def update_person(self, person_id, update_data):
         try:
             response = self.supabase.table('people').update(update_data).eq('person_id', str(person_id)).execute()
-            
+            invalidate_record('people', person_id)
+            rows_updated.send('people', rows=response.data)
+
             if hasattr(response, 'data') and response.data:
                 return {"success": True, "data": response.data}
             else:
                 return {"success": False, "message": "Failed to update person. No data returned from the database."}
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
+
+    def bulk_create_people(self, people, client_id):
+        try:
+            results = []
+            entries = []
+            for index, person in enumerate(people):
+                missing_fields = [field for field in PERSON_FIELD_COLUMNS if field not in person] if isinstance(person, dict) else list(PERSON_FIELD_COLUMNS)
+                if missing_fields:
+                    results.append(item_result(index, None, f"Missing fields: {', '.join(missing_fields)}"))
+                    continue
+                row = {column: person[field] for field, column in PERSON_FIELD_COLUMNS.items()}
+                row['person_id'] = str(uuid.uuid4())
+                row['client_id'] = client_id
+                entries.append((index, row))
+
+            def insert_chunk(rows):
+                response = self.supabase.table('people').insert(rows).execute()
+                rows_created.send('people', rows=response.data)
+
+            results.extend(write_in_chunks(insert_chunk, entries, 'person_id', Config.BULK_CHUNK_SIZE))
+            return summarize(results)
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+
+    def bulk_upsert_people(self, people, client_id):
+        try:
+            results = []
+            entries = []
+            for index, person in enumerate(people):
+                person_id = person.get('person_id') if isinstance(person, dict) else None
+                if not is_uuid(person_id):
+                    results.append(item_result(index, person_id, "Each person needs a valid person_id"))
+                    continue
+                row = {column: value for column, value in person.items() if column in PERSON_FIELD_COLUMNS.values()}
+                row['person_id'] = canonical_uuid(person_id)
+                row['client_id'] = client_id
+                entries.append((index, row))
+
+            owned_ids, foreign_ids = find_existing_ids(self.supabase, 'people', 'person_id', [row['person_id'] for _, row in entries], client_id, Config.BULK_CHUNK_SIZE)
+            results.extend(item_result(index, row['person_id'], "Person not found") for index, row in entries if row['person_id'] in foreign_ids)
+            entries = [(index, row) for index, row in entries if row['person_id'] not in foreign_ids]
+
+            def upsert_chunk(rows):
+                response = self.supabase.table('people').upsert(rows, on_conflict='person_id', default_to_null=False).execute()
+                rows_created.send('people', rows=[row for row in response.data if row['person_id'] not in owned_ids])
+                rows_updated.send('people', rows=[row for row in response.data if row['person_id'] in owned_ids])
+
+            results.extend(write_in_chunks(upsert_chunk, entries, 'person_id', Config.BULK_CHUNK_SIZE))
+            for _, row in entries:
+                invalidate_record('people', row['person_id'])
+            return summarize(results)
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+
+    def bulk_delete_people(self, person_ids, client_id):
+        try:
+            results = []
+            entries = []
+            for index, person_id in enumerate(person_ids):
+                if not is_uuid(person_id):
+                    results.append(item_result(index, person_id, "Invalid person_id"))
+                    continue
+                entries.append((index, canonical_uuid(person_id)))
+
+            def delete_chunk(person_ids):
+                response = self.supabase.table('people').delete().in_('person_id', person_ids).eq('client_id', client_id).execute()
+                rows_deleted.send('people', rows=response.data)
+                for person_id in person_ids:
+                    invalidate_record('people', person_id)
+                return {row['person_id'] for row in response.data or []}
+
+            results.extend(delete_in_chunks(delete_chunk, entries, Config.BULK_CHUNK_SIZE, "Person not found"))
+            return summarize(results)
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
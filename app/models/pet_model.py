@@ -1,4 +1,21 @@
 import uuid
+from flask import current_app
+from app.cache import record_cache, invalidate_record
+from app.config import Config
+from app.models.pagination import select_sorted_page
+from app.models.pet_query import parse_pet_query, apply_pet_filters
+from app.photos import ingest_photo
+from app.analytics.length_of_stay import record_status_transition
+from app.uploads import spooled_upload
+from app.signals import rows_created, rows_updated, rows_deleted
+from app.models.bulk import is_uuid, canonical_uuid, item_result, write_in_chunks, find_existing_ids, delete_in_chunks, summarize
+
+PET_COLUMNS = [
+    "pet_id", "pet_name", "pet_owner_id", "pet_breed", "pet_type", "pet_sex", "pet_photo",
+    "pet_color", "pet_background", "pet_status", "client_id", "created_at"
+]
+
+PET_WRITABLE_COLUMNS = [column for column in PET_COLUMNS if column not in ('pet_id', 'client_id', 'created_at')]
 
 class PetModel:
     def __init__(self, supabase_client):
@@ -17,19 +34,49 @@ class PetModel:
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
 
-    def get_pet_by_id(self, pet_id):
+    def get_pet_by_id(self, pet_id, client_id=None):
+        pet_id = canonical_uuid(pet_id) or str(pet_id)
+        cache_key = ('pets', pet_id)
+        cached = record_cache.get(cache_key)
+        if cached is not None and cached.get('client_id') == client_id:
+            return {"success": True, "data": dict(cached)}
+
         try:
-            response = self.supabase.table('pets').select('*').eq('pet_id', str(pet_id)).single().execute()
+            response = self.supabase.table('pets').select('*').eq('pet_id', pet_id).single().execute()
             if hasattr(response, 'data') and response.data:
+                record_cache.set(cache_key, dict(response.data))
                 return {"success": True, "data": response.data}
             else:
                 return {"success": False, "message": "Pet not found."}
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
 
+    def get_pets_by_ids(self, pet_ids, client_id):
+        try:
+            pet_ids = list(dict.fromkeys(canonical_uuid(pet_id) or str(pet_id) for pet_id in pet_ids))
+            found = {}
+            for pet_id in pet_ids:
+                cached = record_cache.get(('pets', pet_id))
+                if cached is not None and cached.get('client_id') == client_id:
+                    found[pet_id] = dict(cached)
+
+            uncached = [pet_id for pet_id in pet_ids if pet_id not in found]
+            if uncached:
+                response = self.supabase.table('pets').select('*').eq('client_id', client_id).in_('pet_id', uncached).execute()
+                for row in response.data or []:
+                    record_cache.set(('pets', row['pet_id']), dict(row))
+                    found[row['pet_id']] = row
+
+            missing = [pet_id for pet_id in pet_ids if pet_id not in found]
+            return {"success": True, "data": found, "missing": missing}
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+
     def delete_pet(self, pet_id):
         try:
             response = self.supabase.table('pets').delete().eq('pet_id', str(pet_id)).execute()
+            invalidate_record('pets', pet_id)
+            rows_deleted.send('pets', rows=response.data)
             if hasattr(response, 'data') and response.data:
                 return {"success": True}
             elif hasattr(response, 'error') and response.error:
@@ -39,19 +86,52 @@ class PetModel:
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
 
-    def get_all_pets(self, client_id):
+    def get_all_pets(self, client_id, limit=None, cursor=None, fields='*', pet_query=None):
         try:
-            response = self.supabase.table('pets').select('*').eq('client_id', client_id).eq('pet_status', 'Available').execute()
+            pet_query = pet_query or parse_pet_query({})
+            paginated = limit is not None or cursor or pet_query['sort']
+            count = pet_query['count'] if paginated else None
+            query = self.supabase.table('pets').select(fields, count=count).eq('client_id', client_id)
+            query = apply_pet_filters(query, pet_query)
+
+            if paginated:
+                rows, next_cursor, total = select_sorted_page(query, 'pet_id', limit or Config.PAGE_SIZE_DEFAULT, cursor, pet_query['sort'])
+                total_pets = total if total is not None else len(rows)
+                return {"success": True, "total_pets": total_pets, "data": rows, "next_cursor": next_cursor}
+
+            response = query.execute()
 
             if hasattr(response, 'data') and response.data:
         
                 total_pets = len(response.data)
                 return {"success": True, "total_pets": total_pets, "data": response.data}
             else:
-                return {"success": False, "message": "No available pets found for this client."}
+                return {"success": False, "message": "No pets found matching these filters for this client."}
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
 
+    def get_public_url(self, bucket_name, path):
+        photo_url_response = self.supabase.storage.from_(bucket_name).get_public_url(path)
+        if isinstance(photo_url_response, str):
+            return photo_url_response
+        elif isinstance(photo_url_response, dict) and 'publicURL' in photo_url_response:
+            return photo_url_response['publicURL']
+        return None
+
+    def upload_photo_variants(self, derivatives, bucket_name):
+        photo_id = str(uuid.uuid4())
+        variant_urls = {}
+        for name, (content, content_type, extension) in derivatives.items():
+            path = f"{photo_id}/{name}.{extension}"
+            response = self.supabase.storage.from_(bucket_name).upload(path, content, {"content-type": content_type, "cache-control": "31536000"})
+            if isinstance(response, dict) and 'error' in response:
+                return {"success": False, "message": f"Failed to upload photo: {response['error']['message']}"}
+            variant_urls[name] = self.get_public_url(bucket_name, path)
+
+        if not all(variant_urls.values()):
+            return {"success": False, "message": "Failed to retrieve the public URL of the uploaded photo."}
+        return {"success": True, "url": variant_urls['full'], "variants": variant_urls}
+
     def upload_photo(self, file, bucket_name="pet-photos"):
         try:
             if file is None:
@@ -60,20 +140,25 @@ class PetModel:
             if isinstance(file, str):
                 return {"success": True, "url": file}
 
-            file_extension = file.filename.split('.')[-1]
-            unique_filename = f"{uuid.uuid4()}.{file_extension}"
-            file_content = file.read()
-            response = self.supabase.storage.from_(bucket_name).upload(unique_filename, file_content)
+            with spooled_upload(file) as file_content:
+                try:
+                    derivatives = ingest_photo(file_content)
+                except Exception:
+                    derivatives = None
+                if derivatives:
+                    return self.upload_photo_variants(derivatives, bucket_name)
+
+                # Not a decodable image (or Pillow is unavailable): store the original as-is.
+                file_extension = file.filename.split('.')[-1]
+                unique_filename = f"{uuid.uuid4()}.{file_extension}"
+                response = self.supabase.storage.from_(bucket_name).upload(unique_filename, file_content)
 
             if isinstance(response, dict) and 'error' in response:
                 return {"success": False, "message": f"Failed to upload photo: {response['error']['message']}"}
 
-            photo_url_response = self.supabase.storage.from_(bucket_name).get_public_url(unique_filename)
-
-            if isinstance(photo_url_response, str):
-                return {"success": True, "url": photo_url_response}
-            elif isinstance(photo_url_response, dict) and 'publicURL' in photo_url_response:
-                return {"success": True, "url": photo_url_response['publicURL']}
+            photo_url = self.get_public_url(bucket_name, unique_filename)
+            if photo_url:
+                return {"success": True, "url": photo_url}
             else:
                 return {"success": False, "message": "Failed to retrieve the public URL of the uploaded photo."}
         except Exception as e:
@@ -81,6 +166,7 @@ class PetModel:
 
     def add_pet(self, owner_id, pet_name, breed, pet_type, sex, color, background, status, photo_file, client_id):
         try:
+            photo_variants = None
             if photo_file is None:
                 photo_url = None
             elif isinstance(photo_file, str):
@@ -90,10 +176,11 @@ class PetModel:
                 if not upload_result['success']:
                     return {"success": False, "message": upload_result['message']}
                 photo_url = upload_result['url']
+                photo_variants = upload_result.get('variants')
 
             pet_id = str(uuid.uuid4())
 
-            response = self.supabase.table('pets').insert({
+            pet_data = {
                 'pet_id': pet_id,
                 'pet_name': pet_name,
                 'pet_owner_id': owner_id,
@@ -105,7 +192,12 @@ class PetModel:
                 'pet_status': status,
                 'pet_photo': photo_url,
                 'client_id': client_id
-            }).execute()
+            }
+            if photo_variants:
+                pet_data['pet_photo_variants'] = photo_variants
+
+            response = self.supabase.table('pets').insert(pet_data).execute()
+            rows_created.send('pets', rows=response.data)
 
             if response.data:
                 return {"success": True, "data": response.data, "pet_id": pet_id}
@@ -116,7 +208,20 @@ class PetModel:
 
     def update_pet(self, pet_id, update_data):
         try:
+            before = None
+            if 'pet_status' in update_data:
+                previous = self.supabase.table('pets').select('pet_id,client_id,pet_status,pet_type,pet_breed,created_at').eq('pet_id', str(pet_id)).execute()
+                before = previous.data[0] if previous.data else None
+
             response = self.supabase.table('pets').update(update_data).eq('pet_id', str(pet_id)).execute()
+            invalidate_record('pets', pet_id)
+            rows_updated.send('pets', rows=response.data)
+
+            if response.data and before and before.get('pet_status') != update_data['pet_status']:
+                try:
+                    record_status_transition(self.supabase, before, update_data['pet_status'])
+                except Exception as e:
+                    current_app.logger.error(f"Failed to record status transition for pet {pet_id}: {str(e)}")
 
             if hasattr(response, 'data') and response.data:
                 return {"success": True, "data": response.data}
@@ -124,3 +229,77 @@ class PetModel:
                 return {"success": False, "message": "Failed to update pet. No data returned from the database."}
         except Exception as e:
             return {"success": False, "message": f"An error occurred: {str(e)}"}
+
+    def bulk_add_pets(self, pets, client_id):
+        try:
+            results = []
+            entries = []
+            for index, pet in enumerate(pets):
+                if not isinstance(pet, dict) or not pet.get('pet_name'):
+                    results.append(item_result(index, None, "Each pet needs at least a pet_name"))
+                    continue
+                row = {column: pet.get(column) for column in PET_WRITABLE_COLUMNS}
+                row['pet_id'] = str(uuid.uuid4())
+                row['client_id'] = client_id
+                entries.append((index, row))
+
+            def insert_chunk(rows):
+                response = self.supabase.table('pets').insert(rows).execute()
+                rows_created.send('pets', rows=response.data)
+
+            results.extend(write_in_chunks(insert_chunk, entries, 'pet_id', Config.BULK_CHUNK_SIZE))
+            return summarize(results)
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+
+    def bulk_upsert_pets(self, pets, client_id):
+        try:
+            results = []
+            entries = []
+            for index, pet in enumerate(pets):
+                pet_id = pet.get('pet_id') if isinstance(pet, dict) else None
+                if not is_uuid(pet_id):
+                    results.append(item_result(index, pet_id, "Each pet needs a valid pet_id"))
+                    continue
+                row = {column: value for column, value in pet.items() if column in PET_WRITABLE_COLUMNS}
+                row['pet_id'] = canonical_uuid(pet_id)
+                row['client_id'] = client_id
+                entries.append((index, row))
+
+            owned_ids, foreign_ids = find_existing_ids(self.supabase, 'pets', 'pet_id', [row['pet_id'] for _, row in entries], client_id, Config.BULK_CHUNK_SIZE)
+            results.extend(item_result(index, row['pet_id'], "Pet not found") for index, row in entries if row['pet_id'] in foreign_ids)
+            entries = [(index, row) for index, row in entries if row['pet_id'] not in foreign_ids]
+
+            def upsert_chunk(rows):
+                response = self.supabase.table('pets').upsert(rows, on_conflict='pet_id', default_to_null=False).execute()
+                rows_created.send('pets', rows=[row for row in response.data if row['pet_id'] not in owned_ids])
+                rows_updated.send('pets', rows=[row for row in response.data if row['pet_id'] in owned_ids])
+
+            results.extend(write_in_chunks(upsert_chunk, entries, 'pet_id', Config.BULK_CHUNK_SIZE))
+            for _, row in entries:
+                invalidate_record('pets', row['pet_id'])
+            return summarize(results)
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
+
+    def bulk_delete_pets(self, pet_ids, client_id):
+        try:
+            results = []
+            entries = []
+            for index, pet_id in enumerate(pet_ids):
+                if not is_uuid(pet_id):
+                    results.append(item_result(index, pet_id, "Invalid pet_id"))
+                    continue
+                entries.append((index, canonical_uuid(pet_id)))
+
+            def delete_chunk(pet_ids):
+                response = self.supabase.table('pets').delete().in_('pet_id', pet_ids).eq('client_id', client_id).execute()
+                rows_deleted.send('pets', rows=response.data)
+                for pet_id in pet_ids:
+                    invalidate_record('pets', pet_id)
+                return {row['pet_id'] for row in response.data or []}
+
+            results.extend(delete_in_chunks(delete_chunk, entries, Config.BULK_CHUNK_SIZE, "Pet not found"))
+            return summarize(results)
+        except Exception as e:
+            return {"success": False, "message": f"An error occurred: {str(e)}"}
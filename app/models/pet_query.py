@@ -0,0 +1,110 @@
+from datetime import date, datetime, timedelta
+from app.models.bulk import is_uuid, canonical_uuid
+
+PET_FILTERS = {
+    'status': 'pet_status',
+    'type': 'pet_type',
+    'breed': 'pet_breed',
+    'sex': 'pet_sex',
+    'owner': 'pet_owner_id'
+}
+
+PET_SORT_COLUMNS = {
+    'created_at', 'pet_name', 'pet_type', 'pet_breed', 'pet_sex', 'pet_status', 'pet_color'
+}
+
+COUNT_METHODS = {'exact', 'planned', 'estimated'}
+
+DEFAULT_PET_STATUS = 'Available'
+
+def parse_values(value):
+    return [item.strip() for item in value.split(',') if item.strip()]
+
+def parse_timestamp(name, value):
+    try:
+        if len(value) == 10:
+            return date.fromisoformat(value)
+        return datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"{name} must be an ISO date or timestamp")
+
+def parse_sort(value):
+    if not value:
+        return None
+    sort = []
+    for item in parse_values(value):
+        descending = item.startswith('-')
+        column = item.lstrip('-+')
+        if column not in PET_SORT_COLUMNS:
+            raise ValueError(f"Cannot sort by '{column}'. Allowed: {', '.join(sorted(PET_SORT_COLUMNS))}")
+        if any(existing == column for existing, _ in sort):
+            raise ValueError(f"Duplicate sort column: {column}")
+        sort.append((column, descending))
+    # Ascending created_at is the keyset order, so it keeps cursor pagination.
+    if sort == [('created_at', False)]:
+        return None
+    return sort
+
+def parse_pet_query(args):
+    """Validate the filter, sort and count parameters of GET /pets.
+
+    Raises ValueError with a message suitable for a 400 response.
+    """
+    filters = []
+
+    status = args.get('status') or DEFAULT_PET_STATUS
+    if status.lower() != 'all':
+        filters.append(('status', parse_values(status)))
+
+    for name in ('type', 'breed', 'sex'):
+        values = parse_values(args.get(name) or '')
+        if values:
+            filters.append((name, values))
+
+    owner = args.get('owner')
+    if owner:
+        owners = parse_values(owner)
+        if owners != ['none'] and not (owners and all(is_uuid(owner_id) for owner_id in owners)):
+            raise ValueError("owner must be a list of person ids, or 'none'")
+        filters.append(('owner', owners if owners == ['none'] else [canonical_uuid(owner_id) for owner_id in owners]))
+
+    created_from = args.get('created_from')
+    created_to = args.get('created_to')
+    if created_from:
+        created_from = parse_timestamp('created_from', created_from)
+    if created_to:
+        created_to = parse_timestamp('created_to', created_to)
+
+    count = args.get('count') or None
+    if count and count not in COUNT_METHODS:
+        raise ValueError(f"count must be one of: {', '.join(sorted(COUNT_METHODS))}")
+
+    return {
+        "filters": filters,
+        "created_from": created_from,
+        "created_to": created_to,
+        "sort": parse_sort(args.get('sort')),
+        "count": count
+    }
+
+def apply_pet_filters(query, pet_query):
+    for name, values in pet_query['filters']:
+        column = PET_FILTERS[name]
+        if name == 'owner' and values == ['none']:
+            query = query.is_(column, 'null')
+        elif len(values) == 1:
+            query = query.eq(column, values[0])
+        else:
+            query = query.in_(column, values)
+
+    created_from = pet_query.get('created_from')
+    created_to = pet_query.get('created_to')
+    if created_from:
+        query = query.gte('created_at', created_from.isoformat())
+    if created_to:
+        # A bare date means "through the end of that day".
+        if isinstance(created_to, datetime):
+            query = query.lte('created_at', created_to.isoformat())
+        else:
+            query = query.lt('created_at', (created_to + timedelta(days=1)).isoformat())
+    return query
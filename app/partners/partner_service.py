@@ -1,5 +1,6 @@
 from flask import jsonify, session, current_app
 import uuid
+from app.signals import rows_created, rows_deleted
 
 def get_client_id():
     client_id = session.get('user_id')
@@ -21,6 +22,7 @@ class PartnerService:
             partner_data['client_id'] = client_id
 
             response = current_app.supabase.table('partners').insert(partner_data).execute()
+            rows_created.send('partners', rows=response.data)
             if response.data:
                 return jsonify({"success": True, "partner": response.data[0]}), 201
             else:
@@ -81,6 +83,7 @@ class PartnerService:
 
         try:
             response = current_app.supabase.table('partners').delete().eq('id', partner_id).eq('client_id', client_id).execute()
+            rows_deleted.send('partners', rows=response.data)
             if response.data:
                 return jsonify({"success": True, "message": "Partner deleted successfully"}), 200
             else:
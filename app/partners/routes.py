@@ -1,5 +1,6 @@
 from flask import Blueprint, request
 from app.partners.partner_service import PartnerService
+from app.conditional import conditional_get
 from flask_cors import CORS
 
 partners_bp = Blueprint('partners_bp', __name__)
@@ -12,10 +13,12 @@ def create_partner():
     return PartnerService.create_partner(data)
 
 @partners_bp.route('/partners/list', methods=['GET'])
+@conditional_get
 def list_partners():
     return PartnerService.get_all_partners()
 
 @partners_bp.route('/partners/<partner_id>', methods=['GET'])
+@conditional_get
 def get_partner_by_id(partner_id):
     return PartnerService.get_partner_by_id(partner_id)
 
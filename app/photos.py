@@ -0,0 +1,83 @@
+import io
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from app.config import Config
+
+try:
+    from PIL import Image, ImageOps, features
+except ImportError:
+    Image = None
+
+PHOTO_VARIANTS = {
+    'thumb': 256,
+    'card': 640,
+    'full': 1600
+}
+
+PROFILE_PICTURE_VARIANTS = {
+    'profile': 512
+}
+
+PHOTO_FORMATS = {
+    'WEBP': ('image/webp', 'webp'),
+    'JPEG': ('image/jpeg', 'jpg')
+}
+
+executor = None
+executor_lock = threading.Lock()
+
+def get_executor():
+    global executor
+    with executor_lock:
+        if executor is None:
+            # By the first upload the outbox and analytics threads are running, and a child
+            # forked from a multithreaded parent can inherit a lock held mid-operation.
+            start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+            executor = ProcessPoolExecutor(max_workers=Config.PHOTO_WORKERS, mp_context=multiprocessing.get_context(start_method))
+        return executor
+
+def resolve_format(image_format=None):
+    image_format = (image_format or Config.PHOTO_FORMAT).upper()
+    if image_format == 'WEBP' and not features.check('webp'):
+        image_format = 'JPEG'
+    if image_format not in PHOTO_FORMATS:
+        raise ValueError(f"Unsupported photo format: {image_format}")
+    return image_format
+
+def render_variants(source, variants, image_format, quality):
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+
+    rendered = {}
+    with Image.open(source) as image:
+        image = ImageOps.exif_transpose(image)
+        if image_format == 'JPEG':
+            image = image.convert('RGB')
+        elif image.mode not in ('RGB', 'RGBA'):
+            image = image.convert('RGBA')
+        save_options = {'optimize': True} if image_format == 'JPEG' else {'method': 4}
+
+        for name, max_size in variants.items():
+            variant = image.copy()
+            variant.thumbnail((max_size, max_size), Image.LANCZOS)
+            buffer = io.BytesIO()
+            # Nothing from image.info is passed to save(), so EXIF/GPS metadata is dropped.
+            variant.save(buffer, image_format, quality=quality, **save_options)
+            rendered[name] = buffer.getvalue()
+    return rendered
+
+def ingest_photo(source, variants=None, image_format=None):
+    """Resize and re-encode an uploaded photo in the worker pool.
+
+    Returns {variant_name: (content, content_type, extension)}, or None when Pillow is not
+    installed so callers can fall back to storing the original upload.
+    """
+    if Image is None:
+        return None
+
+    image_format = resolve_format(image_format)
+    content_type, extension = PHOTO_FORMATS[image_format]
+    future = get_executor().submit(render_variants, source, variants or PHOTO_VARIANTS, image_format, Config.PHOTO_QUALITY)
+    rendered = future.result(timeout=Config.PHOTO_TIMEOUT)
+    return {name: (content, content_type, extension) for name, content in rendered.items()}
@@ -0,0 +1,36 @@
+import time
+from flask import Blueprint, jsonify, request, current_app, session
+from app.config import Config
+from app.search.search_index import search_indexes, SEARCH_SOURCES
+from flask_cors import CORS
+
+search_bp = Blueprint('search_bp', __name__)
+CORS(search_bp, supports_credentials=True)
+
+@search_bp.route('/search', methods=['GET'])
+def search():
+    client_id = session.get('user_id')
+    if not client_id:
+        return jsonify({"success": False, "error": "Client not logged in"}), 401
+
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({"success": False, "error": "Query parameter 'q' is required"}), 400
+
+    doc_type = request.args.get('type') or None
+    if doc_type and doc_type not in SEARCH_SOURCES:
+        return jsonify({"success": False, "error": f"type must be one of: {', '.join(SEARCH_SOURCES)}"}), 400
+
+    try:
+        limit = min(max(int(request.args.get('limit', 20)), 1), Config.SEARCH_MAX_RESULTS)
+    except ValueError:
+        return jsonify({"success": False, "error": "limit must be an integer"}), 400
+
+    try:
+        started = time.perf_counter()
+        index = search_indexes.get(client_id, current_app.supabase)
+        results = index.search(query, doc_type, limit)
+        took_ms = round((time.perf_counter() - started) * 1000, 2)
+        return jsonify({"success": True, "query": query, "results": results, "took_ms": took_ms}), 200
+    except Exception as e:
+        return jsonify({"success": False, "error": f"An error occurred: {str(e)}"}), 500
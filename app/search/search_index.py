@@ -0,0 +1,254 @@
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from app.config import Config
+from app.models.pagination import select_page
+from app.signals import rows_created, rows_updated, rows_deleted
+
+TOKEN_PATTERN = re.compile(r"[^\W_]+")
+
+SEARCH_SOURCES = {
+    'pet': {
+        'table': 'pets',
+        'id_column': 'pet_id',
+        'fields': {'pet_name': 3.0, 'pet_breed': 2.0, 'pet_background': 1.0},
+        'display': ['pet_name', 'pet_breed', 'pet_type', 'pet_status', 'pet_photo']
+    },
+    'person': {
+        'table': 'people',
+        'id_column': 'person_id',
+        'fields': {'person_first_name': 3.0, 'person_last_name': 3.0, 'person_email': 2.0, 'person_phone': 2.0},
+        'display': ['person_first_name', 'person_last_name', 'person_email', 'person_phone']
+    }
+}
+
+TABLE_DOC_TYPES = {source['table']: doc_type for doc_type, source in SEARCH_SOURCES.items()}
+
+def tokenize(text):
+    return TOKEN_PATTERN.findall(str(text).lower()) if text is not None else []
+
+def field_tokens(field, value):
+    tokens = tokenize(value)
+    # Phone numbers are typed in every format imaginable, so also index the bare digits.
+    if field == 'person_phone' and value:
+        digits = re.sub(r"\D", "", str(value))
+        if digits:
+            tokens.append(digits)
+    return tokens
+
+def trigrams(token):
+    padded = f"  {token} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+class TenantIndex:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.records = {}
+        self.doc_tokens = {}
+        self.postings = defaultdict(dict)
+        self.token_trigrams = {}
+        self.trigram_tokens = defaultdict(set)
+        self.built_at = time.monotonic()
+
+    def add(self, doc_type, row):
+        source = SEARCH_SOURCES[doc_type]
+        doc_key = (doc_type, str(row[source['id_column']]))
+        weights = {}
+        for field, field_weight in source['fields'].items():
+            for token in field_tokens(field, row.get(field)):
+                weights[token] = max(weights.get(token, 0.0), field_weight)
+
+        with self.lock:
+            self.remove_locked(doc_key)
+            self.records[doc_key] = {column: row.get(column) for column in source['display']}
+            self.doc_tokens[doc_key] = set(weights)
+            for token, weight in weights.items():
+                self.postings[token][doc_key] = weight
+                if token not in self.token_trigrams:
+                    self.token_trigrams[token] = trigrams(token)
+                    for trigram in self.token_trigrams[token]:
+                        self.trigram_tokens[trigram].add(token)
+
+    def remove(self, doc_type, record_id):
+        with self.lock:
+            self.remove_locked((doc_type, str(record_id)))
+
+    def remove_locked(self, doc_key):
+        self.records.pop(doc_key, None)
+        for token in self.doc_tokens.pop(doc_key, ()):
+            postings = self.postings.get(token)
+            if postings is None:
+                continue
+            postings.pop(doc_key, None)
+            if not postings:
+                del self.postings[token]
+                for trigram in self.token_trigrams.pop(token, ()):
+                    self.trigram_tokens[trigram].discard(token)
+                    if not self.trigram_tokens[trigram]:
+                        del self.trigram_tokens[trigram]
+
+    def matching_tokens(self, query_token):
+        """Yield (token, similarity) for indexed tokens close enough to the query token."""
+        if query_token in self.postings:
+            yield query_token, 1.0
+
+        query_trigrams = trigrams(query_token)
+        shared = defaultdict(int)
+        for trigram in query_trigrams:
+            for token in self.trigram_tokens.get(trigram, ()):
+                shared[token] += 1
+
+        for token, overlap in shared.items():
+            if token == query_token:
+                continue
+            if token.startswith(query_token):
+                yield token, 0.9
+                continue
+            similarity = overlap / (len(query_trigrams) + len(self.token_trigrams[token]) - overlap)
+            if similarity >= Config.SEARCH_FUZZY_THRESHOLD:
+                yield token, similarity * 0.8
+
+    def search(self, query, doc_type=None, limit=20):
+        query_tokens = list(dict.fromkeys(tokenize(query)))
+        if not query_tokens:
+            return []
+
+        with self.lock:
+            scores = defaultdict(float)
+            matched_terms = defaultdict(int)
+            for query_token in query_tokens:
+                best = {}
+                for token, similarity in self.matching_tokens(query_token):
+                    for doc_key, weight in self.postings[token].items():
+                        if doc_type and doc_key[0] != doc_type:
+                            continue
+                        best[doc_key] = max(best.get(doc_key, 0.0), similarity * weight)
+                for doc_key, score in best.items():
+                    scores[doc_key] += score
+                    matched_terms[doc_key] += 1
+
+            ranked = sorted(scores, key=lambda doc_key: (matched_terms[doc_key], scores[doc_key]), reverse=True)[:limit]
+            return [{
+                "type": doc_key[0],
+                "id": doc_key[1],
+                "score": round(scores[doc_key], 4),
+                "matched_terms": matched_terms[doc_key],
+                "record": dict(self.records[doc_key])
+            } for doc_key in ranked]
+
+class IndexBuild:
+    """A tenant index being built, shared by every request that needs it meanwhile."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.index = None
+        self.error = None
+        # Writes seen while the snapshot was being read, replayed onto it before it is served.
+        self.pending = []
+
+class SearchIndexRegistry:
+    """Per-tenant search indexes, built lazily on first search and kept current by model writes.
+
+    Indexes are rebuilt after SEARCH_INDEX_TTL seconds so writes made by other workers (or
+    outside this app) eventually show up. Only one build per tenant runs at a time.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.indexes = OrderedDict()
+        self.builds = {}
+
+    def get(self, client_id, supabase_client):
+        with self.lock:
+            index = self.indexes.get(client_id)
+            if index is not None and time.monotonic() - index.built_at <= Config.SEARCH_INDEX_TTL:
+                self.indexes.move_to_end(client_id)
+                return index
+            build = self.builds.get(client_id)
+            owner = build is None
+            if owner:
+                build = self.builds[client_id] = IndexBuild()
+
+        if not owner:
+            build.done.wait()
+            if build.error is not None:
+                raise build.error
+            return build.index
+
+        try:
+            index = self.build(client_id, supabase_client)
+        except Exception as e:
+            with self.lock:
+                del self.builds[client_id]
+            build.error = e
+            build.done.set()
+            raise
+
+        with self.lock:
+            for operation, doc_type, payload in build.pending:
+                if operation == 'add':
+                    index.add(doc_type, payload)
+                else:
+                    index.remove(doc_type, payload)
+            del self.builds[client_id]
+            self.indexes[client_id] = index
+            self.indexes.move_to_end(client_id)
+            while len(self.indexes) > Config.SEARCH_MAX_TENANTS:
+                self.indexes.popitem(last=False)
+        build.index = index
+        build.done.set()
+        return index
+
+    def build(self, client_id, supabase_client):
+        index = TenantIndex()
+        for doc_type, source in SEARCH_SOURCES.items():
+            columns = {source['id_column'], 'created_at', *source['fields'], *source['display']}
+            cursor = None
+            while True:
+                query = supabase_client.table(source['table']).select(','.join(sorted(columns))).eq('client_id', client_id)
+                rows, cursor = select_page(query, source['id_column'], Config.EXPORT_PAGE_SIZE, cursor)
+                for row in rows:
+                    index.add(doc_type, row)
+                if not cursor:
+                    break
+        return index
+
+    def apply(self, client_id, operation, doc_type, payload):
+        with self.lock:
+            build = self.builds.get(client_id)
+            if build is not None:
+                build.pending.append((operation, doc_type, payload))
+            index = self.indexes.get(client_id)
+        if index is None:
+            return
+        if operation == 'add':
+            index.add(doc_type, payload)
+        else:
+            index.remove(doc_type, payload)
+
+    def index_rows(self, table, rows):
+        doc_type = TABLE_DOC_TYPES.get(table)
+        if doc_type is None:
+            return
+        for row in rows or []:
+            self.apply(row.get('client_id'), 'add', doc_type, row)
+
+    def remove_rows(self, table, rows):
+        doc_type = TABLE_DOC_TYPES.get(table)
+        if doc_type is None:
+            return
+        id_column = SEARCH_SOURCES[doc_type]['id_column']
+        for row in rows or []:
+            self.apply(row.get('client_id'), 'remove', doc_type, row[id_column])
+
+search_indexes = SearchIndexRegistry()
+
+@rows_created.connect
+@rows_updated.connect
+def index_written_rows(table, rows=None):
+    search_indexes.index_rows(table, rows)
+
+@rows_deleted.connect
+def remove_deleted_rows(table, rows=None):
+    search_indexes.remove_rows(table, rows)
@@ -0,0 +1,9 @@
+from blinker import Namespace
+
+# Write notifications sent by the models and services after a successful write.
+# The sender is the table name and `rows` is the list of rows the database returned.
+write_signals = Namespace()
+
+rows_created = write_signals.signal('rows-created')
+rows_updated = write_signals.signal('rows-updated')
+rows_deleted = write_signals.signal('rows-deleted')
@@ -0,0 +1,50 @@
+import os
+import tempfile
+from contextlib import contextmanager
+from flask import jsonify, request
+from werkzeug.exceptions import RequestEntityTooLarge
+from app.config import Config
+
+def init_uploads(app):
+    max_content_length = app.config['MAX_CONTENT_LENGTH']
+
+    def request_too_large():
+        limit_mb = max_content_length // (1024 * 1024)
+        return jsonify({"success": False, "error": f"Request is too large. The maximum upload size is {limit_mb} MB."}), 413
+
+    # Reject on the declared Content-Length before any view starts reading the body;
+    # the error handler covers chunked bodies that only overflow while being parsed.
+    @app.before_request
+    def check_content_length():
+        if request.content_length is not None and request.content_length > max_content_length:
+            return request_too_large()
+
+    @app.errorhandler(RequestEntityTooLarge)
+    def handle_request_too_large(error):
+        return request_too_large()
+
+@contextmanager
+def spooled_upload(file):
+    """Yield the upload in a form storage3 can send without holding it all in memory.
+
+    Small uploads are returned as bytes. Anything past UPLOAD_SPOOL_THRESHOLD is copied in
+    chunks to a temporary file and its path is yielded instead; storage3 opens the path and
+    the HTTP client streams it from disk. The temporary file is removed on exit.
+    """
+    head = file.stream.read(Config.UPLOAD_SPOOL_THRESHOLD + 1)
+    if len(head) <= Config.UPLOAD_SPOOL_THRESHOLD:
+        yield head
+        return
+
+    spool = tempfile.NamedTemporaryFile(prefix='upload-', delete=False)
+    try:
+        with spool:
+            spool.write(head)
+            while True:
+                chunk = file.stream.read(Config.UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                spool.write(chunk)
+        yield spool.name
+    finally:
+        os.unlink(spool.name)
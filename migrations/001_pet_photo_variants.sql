@@ -0,0 +1,3 @@
+-- Resized WebP/JPEG derivatives created by the photo ingest pipeline (app/photos.py).
+-- Shape: {"thumb": "<url>", "card": "<url>", "full": "<url>"}; pet_photo points at "full".
+alter table pets add column if not exists pet_photo_variants jsonb;
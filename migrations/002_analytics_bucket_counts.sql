@@ -0,0 +1,40 @@
+-- Per-bucket row counts for the analytics dashboard, computed in the database so the
+-- API never downloads rows just to count them.
+create or replace function analytics_bucket_counts(
+    p_table text,
+    p_client_id text,
+    p_start timestamptz,
+    p_end timestamptz,
+    p_interval text default 'day',
+    p_time_zone text default 'UTC'
+)
+returns table(bucket text, count bigint)
+language plpgsql
+stable
+as $$
+begin
+    if p_table not in ('pets', 'people', 'donations', 'partners') then
+        raise exception 'Unsupported analytics table: %', p_table;
+    end if;
+    if p_interval not in ('hour', 'day', 'week', 'month', 'year') then
+        raise exception 'Unsupported analytics interval: %', p_interval;
+    end if;
+
+    return query execute format(
+        'select to_char(date_trunc(%L, created_at at time zone %L), %L) as bucket, count(*) as count
+           from %I
+          where client_id::text = $1 and created_at >= $2 and created_at <= $3
+          group by 1
+          order by 1',
+        p_interval,
+        p_time_zone,
+        case when p_interval = 'hour' then 'YYYY-MM-DD"T"HH24:00' else 'YYYY-MM-DD' end,
+        p_table
+    ) using p_client_id, p_start, p_end;
+end;
+$$;
+
+create index if not exists pets_client_created_at_idx on pets (client_id, created_at);
+create index if not exists people_client_created_at_idx on people (client_id, created_at);
+create index if not exists donations_client_created_at_idx on donations (client_id, created_at);
+create index if not exists partners_client_created_at_idx on partners (client_id, created_at);
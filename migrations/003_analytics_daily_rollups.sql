@@ -0,0 +1,52 @@
+-- Rows created per client, table and UTC day. Kept current by the app on every create and
+-- delete (app/analytics/rollups.py) and rebuilt from the source tables with
+-- `flask rollups rebuild`.
+create table if not exists analytics_daily_rollups (
+    client_id text not null,
+    table_name text not null,
+    day date not null,
+    row_count bigint not null default 0,
+    primary key (client_id, table_name, day)
+);
+
+-- p_deltas: [{"client_id": "...", "day": "YYYY-MM-DD", "delta": 1}, ...]
+create or replace function bump_analytics_rollups(p_table text, p_deltas jsonb)
+returns void
+language sql
+as $$
+    insert into analytics_daily_rollups (client_id, table_name, day, row_count)
+    select d.client_id, p_table, d.day, d.delta
+      from jsonb_to_recordset(p_deltas) as d(client_id text, day date, delta bigint)
+    on conflict (client_id, table_name, day)
+    do update set row_count = analytics_daily_rollups.row_count + excluded.row_count;
+$$;
+
+create or replace function rebuild_analytics_rollups(p_table text, p_client_id text default null)
+returns bigint
+language plpgsql
+as $$
+declare
+    rebuilt bigint;
+begin
+    if p_table not in ('pets', 'people', 'donations', 'partners') then
+        raise exception 'Unsupported analytics table: %', p_table;
+    end if;
+
+    delete from analytics_daily_rollups
+     where table_name = p_table
+       and (p_client_id is null or client_id = p_client_id);
+
+    execute format(
+        'insert into analytics_daily_rollups (client_id, table_name, day, row_count)
+         select client_id::text, %L, (created_at at time zone ''UTC'')::date, count(*)
+           from %I
+          where $1 is null or client_id::text = $1
+          group by 1, 3',
+        p_table,
+        p_table
+    ) using p_client_id;
+
+    get diagnostics rebuilt = row_count;
+    return rebuilt;
+end;
+$$;
@@ -0,0 +1,68 @@
+-- Every pet_status change made through PetModel.update_pet, plus running aggregates per
+-- client, species, breed and status pair (see app/analytics/length_of_stay.py).
+create table if not exists pet_status_transitions (
+    id bigserial primary key,
+    client_id text not null,
+    pet_id text not null,
+    from_status text not null,
+    to_status text not null,
+    pet_type text not null default '',
+    pet_breed text not null default '',
+    stay_seconds double precision not null,
+    transitioned_at timestamptz not null default now()
+);
+
+create index if not exists pet_status_transitions_client_idx
+    on pet_status_transitions (client_id, transitioned_at);
+
+-- sketch maps a log-scale bucket index to a count: a bucket i holds durations in
+-- (gamma^(i-1), gamma^i] seconds, so quantiles come back within the sketch's relative error.
+create table if not exists pet_status_aggregates (
+    client_id text not null,
+    pet_type text not null,
+    pet_breed text not null,
+    from_status text not null,
+    to_status text not null,
+    transitions bigint not null default 0,
+    total_seconds double precision not null default 0,
+    min_seconds double precision,
+    max_seconds double precision,
+    sketch jsonb not null default '{}'::jsonb,
+    primary key (client_id, pet_type, pet_breed, from_status, to_status)
+);
+
+create or replace function record_pet_status_transition(
+    p_client_id text,
+    p_pet_id text,
+    p_from_status text,
+    p_to_status text,
+    p_pet_type text,
+    p_pet_breed text,
+    p_stay_seconds double precision,
+    p_sketch_index integer
+)
+returns void
+language plpgsql
+as $$
+declare
+    bucket text := p_sketch_index::text;
+begin
+    insert into pet_status_transitions (client_id, pet_id, from_status, to_status, pet_type, pet_breed, stay_seconds)
+    values (p_client_id, p_pet_id, p_from_status, p_to_status, coalesce(p_pet_type, ''), coalesce(p_pet_breed, ''), p_stay_seconds);
+
+    insert into pet_status_aggregates as a (
+        client_id, pet_type, pet_breed, from_status, to_status,
+        transitions, total_seconds, min_seconds, max_seconds, sketch
+    )
+    values (
+        p_client_id, coalesce(p_pet_type, ''), coalesce(p_pet_breed, ''), p_from_status, p_to_status,
+        1, p_stay_seconds, p_stay_seconds, p_stay_seconds, jsonb_build_object(bucket, 1)
+    )
+    on conflict (client_id, pet_type, pet_breed, from_status, to_status) do update set
+        transitions = a.transitions + 1,
+        total_seconds = a.total_seconds + excluded.total_seconds,
+        min_seconds = least(a.min_seconds, excluded.min_seconds),
+        max_seconds = greatest(a.max_seconds, excluded.max_seconds),
+        sketch = jsonb_set(a.sketch, array[bucket], to_jsonb(coalesce((a.sketch ->> bucket)::bigint, 0) + 1));
+end;
+$$;
@@ -0,0 +1,76 @@
+-- Everything /donations/analytics reports, computed in one statement
+-- (see app/donations/donation_analytics.py for the fallback used before this is applied).
+create or replace function donation_analytics(
+    p_client_id text,
+    p_start timestamptz,
+    p_previous_start timestamptz,
+    p_previous_end timestamptz,
+    p_top_n integer default 10
+)
+returns jsonb
+language sql
+stable
+as $$
+    with scoped as (
+        select
+            person_id,
+            email,
+            coalesce(title, 'No Title') as title,
+            case
+                when payment_method_id = 'Cash' then 'cash'
+                when payment_method_id is null or payment_method_id = 'Pending' then 'pending'
+                else 'card'
+            end as payment_method,
+            coalesce(payment_status, 'Unknown') as payment_status,
+            case when amount::text ~ '^-?[0-9]+$' then amount::text::bigint else 0 end as amount,
+            created_at
+        from donations
+        where client_id::text = p_client_id
+          and created_at >= least(p_start, p_previous_start)
+    ),
+    current_rows as (
+        select * from scoped where created_at >= p_start
+    )
+    select jsonb_build_object(
+        'total_amount', coalesce((select sum(amount) from current_rows), 0),
+        'donation_count', (select count(*) from current_rows),
+        'unique_donors', (select count(distinct person_id) from current_rows),
+        'previous_total', coalesce((
+            select sum(amount) from scoped
+             where created_at >= p_previous_start and created_at < p_previous_end
+        ), 0),
+        'percentiles', (
+            select jsonb_build_object(
+                'p25', percentile_cont(0.25) within group (order by amount),
+                'p50', percentile_cont(0.5) within group (order by amount),
+                'p75', percentile_cont(0.75) within group (order by amount),
+                'p90', percentile_cont(0.9) within group (order by amount),
+                'p99', percentile_cont(0.99) within group (order by amount)
+            )
+            from current_rows
+        ),
+        'top_donors', coalesce((
+            select jsonb_agg(d order by d.total desc)
+            from (
+                select person_id, max(email) as email, sum(amount) as total, count(*) as count
+                  from current_rows
+                 where person_id is not null
+                 group by person_id
+                 order by total desc
+                 limit p_top_n
+            ) d
+        ), '[]'::jsonb),
+        'by_title', coalesce((
+            select jsonb_agg(t order by t.total desc)
+            from (select title as key, sum(amount) as total, count(*) as count from current_rows group by title) t
+        ), '[]'::jsonb),
+        'by_payment_method', coalesce((
+            select jsonb_agg(m order by m.total desc)
+            from (select payment_method as key, sum(amount) as total, count(*) as count from current_rows group by payment_method) m
+        ), '[]'::jsonb),
+        'by_payment_status', coalesce((
+            select jsonb_agg(s order by s.total desc)
+            from (select payment_status as key, sum(amount) as total, count(*) as count from current_rows group by payment_status) s
+        ), '[]'::jsonb)
+    );
+$$;
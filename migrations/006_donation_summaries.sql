@@ -0,0 +1,81 @@
+-- Running donation count and total per client, payment status and currency, served by
+-- GET /donations (see app/donations/donation_summary.py). A trigger keeps it current on
+-- every insert, delete and change of status, currency or amount, whichever code path
+-- (donation routes, the Stripe webhook, bulk invoices) made the write.
+create table if not exists donation_summaries (
+    client_id text not null,
+    payment_status text not null,
+    currency text not null,
+    donation_count bigint not null default 0,
+    total_amount numeric not null default 0,
+    primary key (client_id, payment_status, currency)
+);
+
+create or replace function donation_amount(p_amount text)
+returns numeric
+language sql
+immutable
+as $$
+    select case when p_amount ~ '^-?[0-9]+(\.[0-9]+)?$' then p_amount::numeric else 0 end;
+$$;
+
+create or replace function bump_donation_summary(
+    p_client_id text,
+    p_payment_status text,
+    p_currency text,
+    p_count bigint,
+    p_amount numeric
+)
+returns void
+language sql
+as $$
+    insert into donation_summaries as s (client_id, payment_status, currency, donation_count, total_amount)
+    values (p_client_id, coalesce(p_payment_status, 'Unknown'), lower(coalesce(p_currency, 'usd')), p_count, p_amount)
+    on conflict (client_id, payment_status, currency) do update set
+        donation_count = s.donation_count + excluded.donation_count,
+        total_amount = s.total_amount + excluded.total_amount;
+$$;
+
+create or replace function track_donation_summary()
+returns trigger
+language plpgsql
+as $$
+begin
+    if tg_op in ('UPDATE', 'DELETE') and old.client_id is not null then
+        perform bump_donation_summary(old.client_id::text, old.payment_status, old.currency, -1, -donation_amount(old.amount::text));
+    end if;
+    if tg_op in ('INSERT', 'UPDATE') and new.client_id is not null then
+        perform bump_donation_summary(new.client_id::text, new.payment_status, new.currency, 1, donation_amount(new.amount::text));
+    end if;
+    return null;
+end;
+$$;
+
+drop trigger if exists donations_summary_trigger on donations;
+create trigger donations_summary_trigger
+    after insert or delete or update of client_id, payment_status, currency, amount on donations
+    for each row execute function track_donation_summary();
+
+-- Backfill from the existing rows; also the way to rebuild the table if it ever drifts.
+create or replace function rebuild_donation_summaries(p_client_id text default null)
+returns bigint
+language plpgsql
+as $$
+declare
+    rebuilt bigint;
+begin
+    delete from donation_summaries where p_client_id is null or client_id = p_client_id;
+
+    insert into donation_summaries (client_id, payment_status, currency, donation_count, total_amount)
+    select client_id::text, coalesce(payment_status, 'Unknown'), lower(coalesce(currency, 'usd')), count(*), sum(donation_amount(amount::text))
+      from donations
+     where client_id is not null
+       and (p_client_id is null or client_id::text = p_client_id)
+     group by 1, 2, 3;
+
+    get diagnostics rebuilt = row_count;
+    return rebuilt;
+end;
+$$;
+
+select rebuild_donation_summaries();
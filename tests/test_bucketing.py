@@ -0,0 +1,52 @@
+from datetime import datetime, timezone
+import pytest
+from app.analytics.bucketing import Buckets, truncate, next_start, parse_time_zone
+
+NEW_YORK = parse_time_zone('America/New_York')
+
+def test_parse_time_zone():
+    assert parse_time_zone(None) is timezone.utc
+    assert parse_time_zone('America/New_York').key == 'America/New_York'
+    with pytest.raises(ValueError, match="Unknown time zone"):
+        parse_time_zone('Mars/Olympus_Mons')
+
+@pytest.mark.parametrize('interval, expected', [
+    ('hour', datetime(2024, 5, 15, 13, tzinfo=timezone.utc)),
+    ('day', datetime(2024, 5, 15, tzinfo=timezone.utc)),
+    ('week', datetime(2024, 5, 13, tzinfo=timezone.utc)),
+    ('month', datetime(2024, 5, 1, tzinfo=timezone.utc)),
+    ('year', datetime(2024, 1, 1, tzinfo=timezone.utc)),
+])
+def test_truncate(interval, expected):
+    assert truncate(datetime(2024, 5, 15, 13, 45, 30, tzinfo=timezone.utc), interval) == expected
+
+def test_next_start_crosses_month_and_year_ends():
+    assert next_start(datetime(2024, 1, 31, tzinfo=timezone.utc), 'day') == datetime(2024, 2, 1, tzinfo=timezone.utc)
+    assert next_start(datetime(2024, 12, 1, tzinfo=timezone.utc), 'month') == datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+def test_day_buckets_follow_dst_change():
+    # 2024-03-10 is 23 hours long in New York.
+    buckets = Buckets(datetime(2024, 3, 9, 12), datetime(2024, 3, 11, 12), 'day', tz=NEW_YORK)
+    assert buckets.labels == ['2024-03-09', '2024-03-10', '2024-03-11']
+    assert buckets.edges[2] - buckets.edges[1] == 23 * 3600
+
+def test_hour_buckets_step_through_dst_change():
+    buckets = Buckets(datetime(2024, 3, 10, 6), datetime(2024, 3, 10, 8), 'hour', tz=NEW_YORK)
+    assert buckets.labels == ['2024-03-10T01:00', '2024-03-10T03:00', '2024-03-10T04:00']
+
+def test_count_sorted():
+    buckets = Buckets(datetime(2024, 1, 1), datetime(2024, 1, 3), 'day')
+    timestamps = sorted(datetime(2024, 1, day, hour, tzinfo=timezone.utc).timestamp() for day, hour in [(1, 0), (1, 23), (3, 5)])
+    assert buckets.count_sorted(timestamps) == [2, 0, 1]
+    assert buckets.count_sorted(timestamps, weights=[10, 5, 1]) == [15, 0, 1]
+    assert buckets.series([2, 0, 1])[0] == {"date": '2024-01-01', "count": 2}
+
+def test_count_labels_fills_missing_buckets():
+    buckets = Buckets(datetime(2024, 1, 1), datetime(2024, 3, 1), 'month')
+    assert buckets.count_labels({'2024-02-01': 4}) == [0, 4, 0]
+
+def test_buckets_reject_unknown_interval_and_too_many_buckets():
+    with pytest.raises(ValueError, match="interval must be one of"):
+        Buckets(datetime(2024, 1, 1), datetime(2024, 1, 2), 'minute')
+    with pytest.raises(ValueError, match="Too many buckets"):
+        Buckets(datetime(2024, 1, 1), datetime(2024, 12, 31), 'hour', max_buckets=100)
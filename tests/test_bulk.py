@@ -0,0 +1,67 @@
+import pytest
+from app.models.bulk import canonical_uuid, write_in_chunks, delete_in_chunks, summarize
+
+ID = '6f9619ff-8b86-d011-b42d-00c04fc964ff'
+
+@pytest.mark.parametrize('value', [ID, ID.upper(), '{' + ID + '}', ID.replace('-', '')])
+def test_canonical_uuid(value):
+    assert canonical_uuid(value) == ID
+
+@pytest.mark.parametrize('value', [None, '', 'p001', ID + '0'])
+def test_canonical_uuid_rejects_non_uuids(value):
+    assert canonical_uuid(value) is None
+
+def test_write_in_chunks_groups_by_chunk_and_column_set():
+    calls = []
+    entries = [(0, {'id': 'a', 'x': 1}), (1, {'id': 'b'}), (2, {'id': 'c', 'x': 2}), (3, {'id': 'd', 'x': 3})]
+
+    results = write_in_chunks(calls.append, entries, 'id', 3)
+
+    assert calls == [[{'id': 'a', 'x': 1}, {'id': 'c', 'x': 2}], [{'id': 'b'}], [{'id': 'd', 'x': 3}]]
+    assert all(result['success'] for result in results)
+
+def test_write_in_chunks_retries_failed_chunk_row_by_row():
+    calls = []
+
+    def write_chunk(rows):
+        calls.append([row['id'] for row in rows])
+        if any(row['id'] == 'bad' for row in rows):
+            raise Exception('rejected row')
+
+    entries = [(0, {'id': 'a'}), (1, {'id': 'bad'}), (2, {'id': 'c'})]
+    results = write_in_chunks(write_chunk, entries, 'id', 10)
+
+    assert calls == [['a', 'bad', 'c'], ['a'], ['bad'], ['c']]
+    assert [(result['index'], result['success']) for result in results] == [(0, True), (1, False), (2, True)]
+    assert results[1]['error'] == 'rejected row'
+
+def test_delete_in_chunks_reports_missing_ids():
+    results = delete_in_chunks(lambda ids: {'a'}, [(0, 'a'), (1, 'b')], 10, "Pet not found")
+    assert results == [
+        {"index": 0, "id": 'a', "success": True},
+        {"index": 1, "id": 'b', "success": False, "error": "Pet not found"}
+    ]
+
+def test_delete_in_chunks_retries_failed_chunk_row_by_row():
+    calls = []
+
+    def delete_chunk(ids):
+        calls.append(ids)
+        if 'bad' in ids:
+            raise Exception('delete failed')
+        return set(ids)
+
+    results = delete_in_chunks(delete_chunk, [(0, 'a'), (1, 'bad'), (2, 'c'), (3, 'd')], 3, "Pet not found")
+
+    assert calls == [['a', 'bad', 'c'], ['a'], ['bad'], ['c'], ['d']]
+    assert {result['index']: result['success'] for result in results} == {0: True, 1: False, 2: True, 3: True}
+
+def test_summarize_orders_results_by_index():
+    summary = summarize([
+        {"index": 2, "id": 'c', "success": True},
+        {"index": 0, "id": 'a', "success": False, "error": "boom"},
+        {"index": 1, "id": 'b', "success": True}
+    ])
+    assert summary["succeeded"] == 2
+    assert summary["failed"] == 1
+    assert [result['index'] for result in summary["results"]] == [0, 1, 2]
@@ -0,0 +1,62 @@
+import pytest
+from app import cache
+from app.cache import TTLCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(cache, 'time', clock)
+    return clock
+
+def test_entries_expire_after_ttl(clock):
+    entries = TTLCache(maxsize=10, ttl=5)
+    entries.set('a', 1)
+    clock.now += 5
+    assert entries.get('a') == 1
+    clock.now += 1
+    assert entries.get('a') is None
+    assert entries.stats()["size"] == 0
+
+def test_stale_entries_only_reach_get_entry(clock):
+    entries = TTLCache(maxsize=10, ttl=5, stale_ttl=10)
+    entries.set('a', 1)
+    clock.now += 8
+    assert entries.get('a') is None
+    assert entries.get_entry('a') == (1, 8)
+    clock.now += 8
+    assert entries.get_entry('a') is None
+
+def test_least_recently_used_entry_is_evicted(clock):
+    entries = TTLCache(maxsize=2, ttl=60)
+    entries.set('a', 1)
+    entries.set('b', 2)
+    entries.get('a')
+    entries.set('c', 3)
+    assert entries.get('b') is None
+    assert entries.get('a') == 1
+    assert entries.get('c') == 3
+    assert entries.stats()["evictions"] == 1
+
+def test_stats_count_hits_and_misses(clock):
+    entries = TTLCache(maxsize=2, ttl=60)
+    entries.set('a', 1)
+    entries.get('a')
+    entries.get('missing')
+    stats = entries.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (1, 1, 0.5)
+
+def test_invalidate_record_drops_only_that_row(monkeypatch):
+    entries = TTLCache(maxsize=10, ttl=60)
+    monkeypatch.setattr(cache, 'record_cache', entries)
+    entries.set(('pets', 'a'), {'pet_id': 'a'})
+    entries.set(('people', 'a'), {'person_id': 'a'})
+    cache.invalidate_record('pets', 'a')
+    assert entries.get(('pets', 'a')) is None
+    assert entries.get(('people', 'a')) == {'person_id': 'a'}
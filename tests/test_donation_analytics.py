@@ -0,0 +1,73 @@
+import pytest
+from app.donations.donation_analytics import summarize_donations, percentile, whole_amount
+
+START = '2024-02-01T00:00:00+00:00'
+PREVIOUS_START = '2024-01-01T00:00:00+00:00'
+
+def donation(amount, created_at='2024-02-10T00:00:00+00:00', **fields):
+    return {'amount': amount, 'created_at': created_at, **fields}
+
+def summarize(donations, top_n=10):
+    return summarize_donations(donations, START, PREVIOUS_START, START, top_n)
+
+def test_whole_amount_matches_the_sql_rule():
+    assert [whole_amount(value) for value in (12, '12', '-3', None, '12.5', 12.5, ' 12', '+5', '1_000', '', 'abc')] == [12, 12, -3, 0, 0, 0, 0, 0, 0, 0, 0]
+
+def test_percentile_interpolates_like_percentile_cont():
+    assert percentile([], 0.5) is None
+    assert percentile([10], 0.9) == 10
+    assert percentile([10, 20, 30, 40], 0.5) == 25
+    assert percentile([10, 20, 30, 40], 0.9) == pytest.approx(37)
+
+def test_current_and_previous_spans():
+    summary = summarize([
+        donation(5, '2024-01-15T00:00:00+00:00'),
+        donation(7, '2024-01-31T23:59:59+00:00'),
+        donation(10, START),
+        donation(20)
+    ])
+    assert summary['total_amount'] == 30
+    assert summary['donation_count'] == 2
+    assert summary['previous_total'] == 12
+    assert summary['percentiles']['p50'] == 15
+
+def test_empty_span():
+    summary = summarize([donation(5, '2024-01-15T00:00:00+00:00')])
+    assert (summary['total_amount'], summary['donation_count'], summary['unique_donors']) == (0, 0, 0)
+    assert summary['percentiles'] == {name: None for name in ('p25', 'p50', 'p75', 'p90', 'p99')}
+    assert summary['top_donors'] == []
+    assert summary['by_title'] == []
+
+def test_top_donors():
+    summary = summarize([
+        donation(10, person_id='a', email='b@example.com'),
+        donation(15, person_id='a', email='a@example.com'),
+        donation(30, person_id='b', email=None),
+        donation(5, person_id='c', email='c@example.com'),
+        donation(100)
+    ], top_n=2)
+    assert summary['unique_donors'] == 3
+    assert summary['top_donors'] == [
+        {"person_id": 'b', "email": None, "total": 30, "count": 1},
+        # max(email), as in the SQL function.
+        {"person_id": 'a', "email": 'b@example.com', "total": 25, "count": 2}
+    ]
+
+def test_breakdowns():
+    summary = summarize([
+        donation(10, title='Gala', payment_method_id='Cash', payment_status='Succeeded'),
+        donation(40, title='Gala', payment_method_id='pm_123', payment_status='Succeeded'),
+        donation(5, payment_method_id='Pending', payment_status='Pending'),
+        donation(1)
+    ])
+    assert summary['by_title'] == [{"key": 'Gala', "total": 50, "count": 2}, {"key": 'No Title', "total": 6, "count": 2}]
+    assert summary['by_payment_method'] == [
+        {"key": 'card', "total": 40, "count": 1},
+        {"key": 'cash', "total": 10, "count": 1},
+        {"key": 'pending', "total": 6, "count": 2}
+    ]
+    assert summary['by_payment_status'] == [
+        {"key": 'Succeeded', "total": 50, "count": 2},
+        {"key": 'Pending', "total": 5, "count": 1},
+        {"key": 'Unknown', "total": 1, "count": 1}
+    ]
@@ -0,0 +1,26 @@
+from app.donations.donation_summary import build_summary
+
+def test_build_summary():
+    summary = build_summary([
+        {'payment_status': 'Succeeded', 'currency': 'usd', 'donation_count': 2, 'total_amount': '30.50'},
+        {'payment_status': 'Succeeded', 'currency': 'eur', 'donation_count': 1, 'total_amount': 10},
+        {'payment_status': 'Pending', 'currency': 'usd', 'donation_count': 1, 'total_amount': None},
+        {'payment_status': 'Failed', 'currency': 'usd', 'donation_count': 3, 'total_amount': 45},
+        {'payment_status': 'Pending', 'currency': 'eur', 'donation_count': 0, 'total_amount': 0}
+    ])
+
+    assert summary["successful"] == {"count": 3, "total_amount": 40.5}
+    assert summary["pending"] == {"count": 1, "total_amount": 0.0}
+    assert summary["by_status"]["Failed"]["count"] == 3
+    assert summary["by_status"]["Succeeded"]["by_currency"] == {
+        'usd': {"count": 2, "total_amount": 30.5},
+        'eur': {"count": 1, "total_amount": 10.0}
+    }
+    assert 'eur' not in summary["by_status"]["Pending"]["by_currency"]
+
+def test_build_summary_without_rows():
+    assert build_summary([]) == {
+        "pending": {"count": 0, "total_amount": 0.0},
+        "successful": {"count": 0, "total_amount": 0.0},
+        "by_status": {}
+    }
@@ -0,0 +1,113 @@
+import threading
+import time
+import pytest
+import requests
+from app import email_outbox
+from app.config import Config
+
+class Response:
+    def __init__(self, status_code, text=''):
+        self.status_code = status_code
+        self.text = text
+
+@pytest.fixture
+def outbox(monkeypatch, tmp_path):
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_PATH', str(tmp_path / 'outbox.sqlite3'))
+    monkeypatch.setattr(email_outbox, 'connections', threading.local())
+    sent = []
+    responses = []
+
+    def send(messages):
+        sent.append([to_email for to_email, _, _ in messages])
+        response = responses.pop(0) if responses else Response(200)
+        if isinstance(response, Exception):
+            raise response
+        return response
+
+    monkeypatch.setattr(email_outbox, 'send_emails_via_resend', send)
+    return sent, responses
+
+def statuses():
+    rows = email_outbox.get_connection().execute('select to_email, status, attempts from email_outbox order by id').fetchall()
+    return [tuple(row) for row in rows]
+
+def test_claim_batch_claims_each_row_once(outbox):
+    email_outbox.enqueue_emails([('a@example.com', 'Hi', '<p>a</p>'), ('b@example.com', 'Hi', '<p>b</p>')])
+    assert [row[1] for row in email_outbox.claim_batch(10)] == ['a@example.com', 'b@example.com']
+    assert email_outbox.claim_batch(10) == []
+
+def test_stale_claim_is_reclaimed(outbox, monkeypatch):
+    email_outbox.enqueue_email('a@example.com', 'Hi', '<p>a</p>')
+    email_outbox.claim_batch(10)
+    later = time.time() + Config.EMAIL_OUTBOX_CLAIM_TIMEOUT + 1
+    monkeypatch.setattr(email_outbox.time, 'time', lambda: later)
+    assert len(email_outbox.claim_batch(10)) == 1
+
+def test_failed_enqueue_rolls_back(outbox):
+    with pytest.raises(Exception):
+        email_outbox.enqueue_emails([('a@example.com', 'Hi', '<p>a</p>'), (None, 'Hi', '<p>b</p>')])
+    assert statuses() == []
+
+def test_drain_once_deletes_sent_rows(outbox):
+    sent, _ = outbox
+    email_outbox.enqueue_emails([('a@example.com', 'Hi', '<p>a</p>'), ('b@example.com', 'Hi', '<p>b</p>')])
+    assert email_outbox.drain_once() == 2
+    assert sent == [['a@example.com', 'b@example.com']]
+    assert statuses() == []
+
+@pytest.mark.parametrize('failure', [Response(429), Response(503), requests.ConnectionError('reset')])
+def test_transient_failure_is_retried_later(outbox, failure):
+    _, responses = outbox
+    responses.append(failure)
+    email_outbox.enqueue_email('a@example.com', 'Hi', '<p>a</p>')
+    email_outbox.drain_once()
+    assert statuses() == [('a@example.com', 'pending', 1)]
+    assert email_outbox.claim_batch(10) == []
+
+def test_rejected_batch_is_resent_one_by_one(outbox):
+    sent, responses = outbox
+    responses.extend([Response(422, 'invalid to'), Response(200), Response(422, 'invalid to')])
+    email_outbox.enqueue_emails([('a@example.com', 'Hi', '<p>a</p>'), ('bad', 'Hi', '<p>b</p>')])
+    email_outbox.drain_once()
+    assert sent == [['a@example.com', 'bad'], ['a@example.com'], ['bad']]
+    assert statuses() == [('bad', 'failed', 1)]
+
+def test_gives_up_after_max_attempts(outbox, monkeypatch):
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_MAX_ATTEMPTS', 2)
+    email_outbox.enqueue_email('a@example.com', 'Hi', '<p>a</p>')
+    rows = email_outbox.claim_batch(10)
+    email_outbox.mark_failed(rows, 'timeout', retryable=True)
+    assert statuses() == [('a@example.com', 'pending', 1)]
+    email_outbox.mark_failed([(*rows[0][:4], 1, rows[0][5])], 'timeout', retryable=True)
+    assert statuses() == [('a@example.com', 'failed', 2)]
+
+def test_backoff_doubles_up_to_the_cap(monkeypatch):
+    monkeypatch.setattr(email_outbox.random, 'uniform', lambda low, high: high)
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_BACKOFF', 5)
+    monkeypatch.setattr(Config, 'EMAIL_OUTBOX_BACKOFF_MAX', 30)
+    assert [email_outbox.backoff_seconds(attempts) for attempts in range(1, 6)] == [5, 10, 20, 30, 30]
+
+def test_auth_failure_pauses_without_spending_attempts(outbox, monkeypatch):
+    monkeypatch.setattr(email_outbox, 'pause', {"until": 0.0, "failures": 0})
+    sent, responses = outbox
+    responses.append(Response(401, 'invalid api key'))
+    email_outbox.enqueue_emails([('a@example.com', 'Hi', '<p>a</p>'), ('b@example.com', 'Hi', '<p>b</p>')])
+    email_outbox.drain_once()
+    assert sent == [['a@example.com', 'b@example.com']]
+    assert statuses() == [('a@example.com', 'pending', 0), ('b@example.com', 'pending', 0)]
+    assert email_outbox.paused_seconds() > 0
+    assert email_outbox.drain_once() == 0
+
+    later = email_outbox.pause["until"] + 1
+    monkeypatch.setattr(email_outbox.time, 'time', lambda: later)
+    assert email_outbox.drain_once() == 2
+    assert email_outbox.paused_seconds() == 0
+    assert statuses() == []
+
+def test_other_client_errors_fail_the_batch_without_splitting(outbox):
+    sent, responses = outbox
+    responses.append(Response(404, 'not found'))
+    email_outbox.enqueue_emails([('a@example.com', 'Hi', '<p>a</p>'), ('b@example.com', 'Hi', '<p>b</p>')])
+    email_outbox.drain_once()
+    assert sent == [['a@example.com', 'b@example.com']]
+    assert statuses() == [('a@example.com', 'failed', 1), ('b@example.com', 'failed', 1)]
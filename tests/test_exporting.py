@@ -0,0 +1,27 @@
+from datetime import datetime, timezone
+import pytest
+from app.main.exporting import arrow_schema, to_record_batch
+
+pyarrow = pytest.importorskip('pyarrow')
+
+FIELDS = ['person_id', 'person_age', 'created_at']
+
+def test_arrow_schema_types_known_columns():
+    schema = arrow_schema(FIELDS)
+    assert schema.field('person_id').type == pyarrow.string()
+    assert schema.field('person_age').type == pyarrow.int64()
+    assert schema.field('created_at').type == pyarrow.timestamp('us', tz='UTC')
+
+def test_record_batch_converts_values():
+    batch = to_record_batch([
+        {'person_id': 'a', 'person_age': '12', 'created_at': '2024-01-01T05:00:00.5-05:00'},
+        {'person_id': 'b', 'person_age': 'twelve', 'created_at': '2024-01-01T00:00:00'},
+        {'person_id': 'c'}
+    ], FIELDS, arrow_schema(FIELDS))
+
+    assert batch.column(1).to_pylist() == [12, None, None]
+    assert batch.column(2).to_pylist() == [
+        datetime(2024, 1, 1, 10, 0, 0, 500000, tzinfo=timezone.utc),
+        datetime(2024, 1, 1, tzinfo=timezone.utc),
+        None
+    ]
@@ -0,0 +1,64 @@
+import pytest
+from app import http_client
+from app.http_client import CircuitBreaker, CircuitOpenError, RetryBudget
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(http_client, 'time', clock)
+    return clock
+
+def test_breaker_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('api.example.com', threshold=2, reset_timeout=30)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state() == 'closed'
+    breaker.record_failure()
+    assert breaker.state() == 'open'
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    assert breaker.stats()["rejected"] == 1
+
+def test_breaker_lets_one_probe_through_when_half_open(clock):
+    breaker = CircuitBreaker('api.example.com', threshold=1, reset_timeout=30)
+    breaker.record_failure()
+    clock.now += 30
+    assert breaker.state() == 'half-open'
+    breaker.before_request()
+    with pytest.raises(CircuitOpenError):
+        breaker.before_request()
+    breaker.record_success()
+    assert breaker.state() == 'closed'
+
+def test_failed_probe_reopens_breaker(clock):
+    breaker = CircuitBreaker('api.example.com', threshold=5, reset_timeout=30)
+    for _ in range(5):
+        breaker.record_failure()
+    clock.now += 30
+    breaker.before_request()
+    breaker.record_failure()
+    assert breaker.state() == 'open'
+    clock.now += 30
+    breaker.before_request()
+
+def test_retry_budget_allows_minimum_plus_ratio(clock):
+    budget = RetryBudget(ratio=0.5, minimum=1, window=10)
+    for _ in range(4):
+        budget.record_request()
+    assert [budget.try_spend() for _ in range(4)] == [True, True, True, False]
+    assert budget.stats() == {"requests": 4, "retries": 3, "exhausted": 1}
+
+def test_retry_budget_forgets_events_outside_window(clock):
+    budget = RetryBudget(ratio=0, minimum=1, window=10)
+    assert budget.try_spend()
+    assert not budget.try_spend()
+    clock.now += 11
+    assert budget.try_spend()
@@ -0,0 +1,33 @@
+import random
+from collections import Counter
+import pytest
+from app.analytics.length_of_stay import sketch_index, sketch_quantiles, SKETCH_RELATIVE_ACCURACY, QUANTILES
+
+def exact_quantile(values, q):
+    return sorted(values)[int(q * (len(values) - 1))]
+
+def test_sketch_index_is_monotonic_and_clamps_short_stays():
+    assert sketch_index(0) == sketch_index(1) == 0
+    assert sketch_index(-5) == 0
+    indexes = [sketch_index(seconds) for seconds in (60, 3600, 86400, 86400 * 365)]
+    assert indexes == sorted(indexes)
+
+@pytest.mark.parametrize('seed', [1, 2, 3])
+def test_quantiles_are_within_relative_accuracy(seed):
+    rng = random.Random(seed)
+    stays = [rng.lognormvariate(13, 1.5) for _ in range(5000)]
+    estimates = sketch_quantiles(Counter(sketch_index(seconds) for seconds in stays))
+    for q in QUANTILES:
+        exact = exact_quantile(stays, q)
+        assert abs(estimates[q] - exact) <= SKETCH_RELATIVE_ACCURACY * exact * 1.0001
+
+def test_quantiles_accept_string_keys_and_skip_empty_buckets():
+    # Sketches come back from the database as JSON objects, so their keys are strings.
+    sketch = {str(sketch_index(10000)): 3, str(sketch_index(100)): 1, str(sketch_index(50)): 0}
+    estimates = sketch_quantiles(sketch, quantiles=(0.25, 0.5))
+    assert estimates[0.25] == pytest.approx(100, rel=SKETCH_RELATIVE_ACCURACY)
+    assert estimates[0.5] == pytest.approx(10000, rel=SKETCH_RELATIVE_ACCURACY)
+
+def test_empty_sketch_has_no_quantiles():
+    assert sketch_quantiles({}) == {q: None for q in QUANTILES}
+    assert sketch_quantiles({'5': 0}) == {q: None for q in QUANTILES}
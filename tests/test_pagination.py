@@ -0,0 +1,43 @@
+import base64
+import json
+import pytest
+from app.config import Config
+from app.models.pagination import encode_cursor, decode_cursor, parse_limit
+
+PET_ID = '6f9619ff-8b86-d011-b42d-00c04fc964ff'
+
+def raw_cursor(payload):
+    return base64.urlsafe_b64encode(json.dumps(payload).encode('utf-8')).decode('ascii').rstrip('=')
+
+def test_cursor_round_trip():
+    cursor = encode_cursor({'created_at': '2024-01-01T00:00:00.123456+00:00', 'pet_id': PET_ID}, 'pet_id')
+    assert '=' not in cursor
+    assert decode_cursor(cursor) == ('2024-01-01T00:00:00.123456+00:00', PET_ID)
+
+def test_decode_cursor_canonicalizes_record_id():
+    cursor = raw_cursor(['2024-01-01T00:00:00Z', '{' + PET_ID.upper() + '}'])
+    assert decode_cursor(cursor) == ('2024-01-01T00:00:00Z', PET_ID)
+
+@pytest.mark.parametrize('cursor', [
+    'not base64!',
+    raw_cursor({'created_at': '2024-01-01T00:00:00Z'}),
+    raw_cursor(['2024-01-01T00:00:00Z']),
+    raw_cursor([None, PET_ID]),
+    raw_cursor(['2024-01-01T00:00:00Z', 42]),
+    raw_cursor(['2024-01-01T00:00:00Z', 'x",client_id.neq."y']),
+    raw_cursor(['2024-01-01",client_id.neq."x', PET_ID]),
+])
+def test_decode_cursor_rejects_invalid(cursor):
+    with pytest.raises(ValueError, match="Invalid cursor"):
+        decode_cursor(cursor)
+
+def test_parse_limit():
+    assert parse_limit(None) is None
+    assert parse_limit('') is None
+    assert parse_limit('25') == 25
+    assert parse_limit(str(Config.PAGE_SIZE_MAX + 1)) == Config.PAGE_SIZE_MAX
+
+@pytest.mark.parametrize('value', ['abc', '1.5', '0', '-3'])
+def test_parse_limit_rejects_invalid(value):
+    with pytest.raises(ValueError):
+        parse_limit(value)
@@ -0,0 +1,69 @@
+from datetime import date, datetime
+import pytest
+from app.models.pet_query import parse_pet_query, parse_sort, apply_pet_filters
+
+OWNER = '6f9619ff-8b86-d011-b42d-00c04fc964ff'
+
+def test_defaults_to_available_pets():
+    pet_query = parse_pet_query({})
+    assert pet_query == {"filters": [('status', ['Available'])], "created_from": None, "created_to": None, "sort": None, "count": None}
+
+def test_status_all_and_list_filters():
+    pet_query = parse_pet_query({'status': 'all', 'type': 'Dog, Cat,', 'sex': 'F'})
+    assert pet_query['filters'] == [('type', ['Dog', 'Cat']), ('sex', ['F'])]
+
+def test_owner_ids_are_canonicalized():
+    assert parse_pet_query({'owner': OWNER.upper()})['filters'][-1] == ('owner', [OWNER])
+    assert parse_pet_query({'owner': 'none'})['filters'][-1] == ('owner', ['none'])
+
+@pytest.mark.parametrize('owner', ['bob', f'none,{OWNER}', f'{OWNER},x', ','])
+def test_owner_rejects_anything_but_ids_or_none(owner):
+    with pytest.raises(ValueError, match="owner must be"):
+        parse_pet_query({'owner': owner})
+
+def test_created_range_accepts_dates_and_timestamps():
+    pet_query = parse_pet_query({'created_from': '2024-01-01', 'created_to': '2024-02-01T12:00:00+00:00'})
+    assert pet_query['created_from'] == date(2024, 1, 1)
+    assert isinstance(pet_query['created_to'], datetime)
+    with pytest.raises(ValueError, match="created_from must be"):
+        parse_pet_query({'created_from': 'yesterday'})
+
+def test_count_must_be_known_method():
+    assert parse_pet_query({'count': 'exact'})['count'] == 'exact'
+    with pytest.raises(ValueError, match="count must be one of"):
+        parse_pet_query({'count': 'all'})
+
+def test_parse_sort():
+    assert parse_sort('') is None
+    assert parse_sort('created_at') is None
+    assert parse_sort('-created_at') == [('created_at', True)]
+    assert parse_sort('pet_type,-pet_name') == [('pet_type', False), ('pet_name', True)]
+
+@pytest.mark.parametrize('value, message', [
+    ('pet_owner_id', "Cannot sort by 'pet_owner_id'"),
+    ('client_id', "Cannot sort by 'client_id'"),
+    ('pet_name,-pet_name', "Duplicate sort column: pet_name"),
+])
+def test_parse_sort_rejects_invalid(value, message):
+    with pytest.raises(ValueError, match=message):
+        parse_sort(value)
+
+class RecordingQuery:
+    def __init__(self):
+        self.calls = []
+
+    def __getattr__(self, name):
+        def record(*args):
+            self.calls.append((name, *args))
+            return self
+        return record
+
+def test_apply_pet_filters():
+    pet_query = parse_pet_query({'status': 'Available,Adopted', 'owner': 'none', 'created_from': '2024-01-01', 'created_to': '2024-01-31'})
+    query = apply_pet_filters(RecordingQuery(), pet_query)
+    assert query.calls == [
+        ('in_', 'pet_status', ['Available', 'Adopted']),
+        ('is_', 'pet_owner_id', 'null'),
+        ('gte', 'created_at', '2024-01-01'),
+        ('lt', 'created_at', '2024-02-01')
+    ]
@@ -0,0 +1,116 @@
+import threading
+import pytest
+from app.config import Config
+from app.search.search_index import TenantIndex, SearchIndexRegistry, tokenize
+
+def pet(pet_id, name, breed=None, background=None, client_id='c1'):
+    return {'pet_id': pet_id, 'client_id': client_id, 'pet_name': name, 'pet_breed': breed, 'pet_background': background}
+
+@pytest.fixture
+def index():
+    index = TenantIndex()
+    index.add('pet', pet('1', 'Bella', 'Beagle'))
+    index.add('pet', pet('2', 'Max', 'Bellamy terrier'))
+    index.add('pet', pet('3', 'Rex', 'Boxer', 'Found near Bella Vista park'))
+    index.add('person', {'person_id': '4', 'client_id': 'c1', 'person_first_name': 'Ana', 'person_phone': '(555) 010-2030'})
+    return index
+
+def ids(results):
+    return [result['id'] for result in results]
+
+def test_tokenize():
+    assert tokenize("Mr. O'Neil_Jr 42") == ['mr', 'o', 'neil', 'jr', '42']
+    assert tokenize(None) == []
+
+def test_exact_match_outranks_prefix_and_field_weight_breaks_ties(index):
+    results = index.search('bella')
+    # Exact name (weight 3), prefix of a breed token (0.9 * 2), exact background word (weight 1).
+    assert ids(results) == ['1', '2', '3']
+    assert [result['score'] for result in results] == [3.0, 1.8, 1.0]
+
+def test_documents_matching_more_terms_rank_first(index):
+    assert ids(index.search('bella boxer'))[0] == '3'
+
+def test_fuzzy_match_respects_threshold(index, monkeypatch):
+    assert index.search('bela')[0]['id'] == '1'
+    monkeypatch.setattr(Config, 'SEARCH_FUZZY_THRESHOLD', 0.9)
+    assert '1' not in ids(index.search('bela'))
+
+def test_matching_tokens_scores(index):
+    matches = dict(index.matching_tokens('bell'))
+    assert matches['bella'] == 0.9
+    assert matches['bellamy'] == 0.9
+    assert 'max' not in matches
+    assert dict(index.matching_tokens('max'))['max'] == 1.0
+
+def test_phone_digits_and_type_filter(index):
+    assert ids(index.search('5550102030')) == ['4']
+    assert ids(index.search('bella', doc_type='person')) == []
+
+def test_removed_documents_are_not_found(index):
+    index.remove('pet', '1')
+    assert '1' not in ids(index.search('bella'))
+    assert 'beagle' not in index.postings
+
+class BlockingRegistry(SearchIndexRegistry):
+    """Registry whose build waits until released, with writes made while it runs."""
+
+    def __init__(self, writes=()):
+        super().__init__()
+        self.started = threading.Event()
+        self.release = threading.Event()
+        self.builds_run = 0
+        self.writes = writes
+
+    def build(self, client_id, supabase_client):
+        self.builds_run += 1
+        index = TenantIndex()
+        index.add('pet', pet('1', 'Bella'))
+        index.add('pet', pet('2', 'Max'))
+        self.started.set()
+        for write in self.writes:
+            write(self)
+        self.release.wait(5)
+        return index
+
+def test_writes_during_build_are_replayed():
+    registry = BlockingRegistry(writes=[
+        lambda registry: registry.index_rows('pets', [pet('5', 'Luna')]),
+        lambda registry: registry.remove_rows('pets', [pet('2', 'Max')]),
+        lambda registry: registry.index_rows('pets', [pet('6', 'Milo', client_id='c2')])
+    ])
+    registry.release.set()
+    index = registry.get('c1', None)
+    assert ids(index.search('luna')) == ['5']
+    assert ids(index.search('max')) == []
+    assert ids(index.search('milo')) == []
+    assert registry.builds == {}
+
+def test_concurrent_gets_share_one_build():
+    registry = BlockingRegistry()
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get('c1', None))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    registry.started.wait(5)
+    registry.release.set()
+    for thread in threads:
+        thread.join(5)
+    assert registry.builds_run == 1
+    assert len(results) == 4 and all(index is results[0] for index in results)
+
+def test_failed_build_is_retried_by_the_next_get():
+    registry = SearchIndexRegistry()
+    calls = []
+
+    def build(client_id, supabase_client):
+        calls.append(client_id)
+        if len(calls) == 1:
+            raise RuntimeError('database unavailable')
+        return TenantIndex()
+
+    registry.build = build
+    with pytest.raises(RuntimeError):
+        registry.get('c1', None)
+    assert registry.get('c1', None) is not None
+    assert len(calls) == 2
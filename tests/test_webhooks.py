@@ -0,0 +1,118 @@
+import hashlib
+import hmac
+import json
+import time
+import pytest
+from flask import Flask
+from app.config import Config
+from app.donations import webhooks
+
+SECRET = 'whsec_test'
+
+class Response:
+    def __init__(self, data):
+        self.data = data
+
+class DonationsTable:
+    """Enough of the supabase query builder for finalize_donation's guarded update."""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.filters = []
+        self.fields = None
+
+    def table(self, name):
+        assert name == 'donations'
+        self.filters = []
+        return self
+
+    def update(self, fields):
+        self.fields = fields
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def or_(self, expression):
+        def matches(row, term):
+            column, operator, value = term.split('.', 2)
+            if operator == 'is':
+                return value == 'null' and row.get(column) is None
+            # Like SQL, a comparison with NULL is never true.
+            return row.get(column) is not None and row.get(column) != value
+        terms = expression.split(',')
+        self.filters.append(lambda row: any(matches(row, term) for term in terms))
+        return self
+
+    def execute(self):
+        updated = [row for row in self.rows if all(matches(row) for matches in self.filters)]
+        for row in updated:
+            row.update(self.fields)
+        return Response([dict(row) for row in updated])
+
+@pytest.fixture
+def webhook(monkeypatch):
+    monkeypatch.setattr(Config, 'STRIPE_WEBHOOK_SECRET', SECRET)
+    emails = []
+    monkeypatch.setattr(webhooks, 'enqueue_email', lambda to_email, subject, html: emails.append(to_email))
+    app = Flask(__name__)
+    app.add_url_rule('/stripe/webhook', view_func=webhooks.handle_stripe_webhook, methods=['POST'])
+    app.supabase = DonationsTable([])
+    return app, emails
+
+def event(event_type='payment_intent.succeeded', donation_id='d1'):
+    return {
+        'id': 'evt_1',
+        'object': 'event',
+        'type': event_type,
+        'data': {'object': {'id': 'pi_1', 'object': 'payment_intent', 'payment_method': 'pm_1', 'metadata': {'donation_id': donation_id, 'first_name': 'Ana'}}}
+    }
+
+def post(app, payload, secret=SECRET):
+    body = json.dumps(payload)
+    timestamp = int(time.time())
+    signature = hmac.new(secret.encode(), f"{timestamp}.{body}".encode(), hashlib.sha256).hexdigest()
+    return app.test_client().post('/stripe/webhook', data=body, headers={'Stripe-Signature': f"t={timestamp},v1={signature}"})
+
+def test_rejects_bad_signature(webhook):
+    app, emails = webhook
+    app.supabase.rows.append({'donation_id': 'd1', 'payment_status': 'Pending', 'email': 'a@example.com', 'amount': '10'})
+    response = post(app, event(), secret='whsec_other')
+    assert response.status_code == 400
+    assert response.get_json() == {'error': 'Invalid signature'}
+    assert app.supabase.rows[0]['payment_status'] == 'Pending'
+    assert emails == []
+
+def test_unconfigured_secret_is_503(webhook, monkeypatch):
+    app, _ = webhook
+    monkeypatch.setattr(Config, 'STRIPE_WEBHOOK_SECRET', None)
+    assert post(app, event()).status_code == 503
+
+@pytest.mark.parametrize('status', ['Pending', None])
+def test_succeeded_event_finalizes_donation_and_queues_receipt(webhook, status):
+    app, emails = webhook
+    app.supabase.rows.append({'donation_id': 'd1', 'payment_status': status, 'email': 'a@example.com', 'amount': '10'})
+    response = post(app, event())
+    assert response.status_code == 200
+    assert app.supabase.rows[0]['payment_status'] == 'Succeeded'
+    assert app.supabase.rows[0]['stripe_payment_intent_id'] == 'pi_1'
+    assert emails == ['a@example.com']
+
+def test_redelivered_event_is_a_no_op(webhook):
+    app, emails = webhook
+    app.supabase.rows.append({'donation_id': 'd1', 'payment_status': 'Pending', 'email': 'a@example.com', 'amount': '10'})
+    assert post(app, event()).status_code == 200
+    assert post(app, event()).status_code == 200
+    assert emails == ['a@example.com']
+
+def test_failed_event_never_overwrites_a_success(webhook):
+    app, _ = webhook
+    app.supabase.rows.append({'donation_id': 'd1', 'payment_status': 'Succeeded', 'email': 'a@example.com', 'amount': '10'})
+    assert post(app, event('payment_intent.payment_failed')).status_code == 200
+    assert app.supabase.rows[0]['payment_status'] == 'Succeeded'
+
+def test_handler_error_asks_stripe_to_redeliver(webhook, monkeypatch):
+    app, _ = webhook
+    monkeypatch.setitem(webhooks.EVENT_HANDLERS, 'payment_intent.succeeded', lambda payment_intent: 1 / 0)
+    assert post(app, event()).status_code == 500